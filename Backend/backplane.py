@@ -0,0 +1,331 @@
+# backplane.py
+"""
+Cross-process routing for telemetry. Every server process keeps its own
+student and teacher sockets; the backplane carries what the others need:
+
+  - telemetry packets, published per session, delivered to the local
+    teacher hub of every process that has teachers in that session
+  - "student left" notices, so snapshot teachers drop the student
+  - report cache invalidations after telemetry is written
+  - which students are online, and on which process
+
+BACKPLANE_URL unset -> LocalBackplane (one process, no network).
+BACKPLANE_URL=redis://[:password@]host:6379/0 -> RedisBackplane, which
+speaks RESP directly; `python resp_standin.py` is a local stand-in server.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from urllib.parse import urlparse
+
+from broadcast import teacher_hub
+from report_cache import report_cache
+
+log = logging.getLogger("smartsession")
+
+BACKPLANE_URL = os.getenv("BACKPLANE_URL", "")
+BACKPLANE_PREFIX = os.getenv("BACKPLANE_PREFIX", "smartsession")
+# Messages waiting to go out to Redis before new ones are dropped
+BACKPLANE_QUEUE_SIZE = int(os.getenv("BACKPLANE_QUEUE_SIZE", 10000))
+
+
+class LocalBackplane:
+    """Single process: everything is delivered straight to this process's hub."""
+
+    kind = "local"
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.node = uuid.uuid4().hex[:8]
+        self.presence = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish_telemetry(self, session, packet, key):
+        self.hub.publish(packet, session, key)
+
+    def student_left(self, session, key):
+        self.hub.forget(session, key)
+
+    def invalidate_reports(self, student_ids):
+        report_cache.invalidate(student_ids)
+
+    async def student_online(self, student_id, info):
+        self.presence[str(student_id)] = {**info, "node": self.node}
+
+    async def student_offline(self, student_id):
+        self.presence.pop(str(student_id), None)
+
+    async def online(self):
+        return dict(self.presence)
+
+    def stats(self):
+        return {"kind": self.kind, "node": self.node}
+
+
+# ---------- RESP (Redis protocol) ----------
+def encode_command(*args):
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+class RespError(Exception):
+    """An error reply (-ERR, -NOAUTH, -WRONGTYPE ...); read_reply returns it rather than raising."""
+
+
+async def read_reply(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("backplane connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        return RespError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"bad RESP reply: {line!r}")
+
+
+class RedisBackplane(LocalBackplane):
+    """
+    Redis pub/sub backplane. Local teachers are served directly; the same
+    message is published on the session's channel for other processes,
+    which ignore their own messages. A process only subscribes to sessions
+    it has teachers in (plus one control channel), and publishing is
+    pipelined by a sender task so student sockets never wait on Redis.
+    """
+
+    kind = "redis"
+
+    def __init__(self, hub, url, prefix=BACKPLANE_PREFIX):
+        super().__init__(hub)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.control_channel = f"{prefix}:control"
+        self.presence_key = f"{prefix}:students"
+
+        self.channels = {self.control_channel}
+        # Created here, so presence/publish calls made before start() queue up
+        self.outbox = asyncio.Queue(maxsize=BACKPLANE_QUEUE_SIZE)
+        self._conn = None        # (reader, writer) for commands
+        self._conn_lock = asyncio.Lock()
+        self._sub_writer = None
+        self._tasks = []
+
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.rejected = 0  # commands Redis answered with an error
+        self.connected = False
+
+    def channel(self, session):
+        return f"{self.prefix}:session:{session}"
+
+    # ---------- Lifecycle ----------
+    async def start(self):
+        self.hub.room_listener = self._room_changed
+        for session in self.hub.rooms:
+            self.channels.add(self.channel(session))
+        self._tasks = [asyncio.create_task(self._sender()), asyncio.create_task(self._subscriber())]
+        log.info("🔌 Backplane node %s -> redis://%s:%s/%s", self.node, self.host, self.port, self.db)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for writer in (self._conn and self._conn[1], self._sub_writer):
+            if writer is not None:
+                writer.close()
+        self._conn = self._sub_writer = None
+        self.hub.room_listener = None
+
+    async def _open(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+        if self.db:
+            writer.write(encode_command("SELECT", self.db))
+        await writer.drain()
+        for _ in range(bool(self.password) + bool(self.db)):
+            reply = await read_reply(reader)
+            if isinstance(reply, RespError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    # ---------- Outgoing ----------
+    def _send(self, *command):
+        try:
+            self.outbox.put_nowait(command)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _publish(self, channel, message):
+        message["node"] = self.node
+        self._send("PUBLISH", channel, json.dumps(message))
+
+    async def _sender(self):
+        while True:
+            batch = [await self.outbox.get()]
+            while not self.outbox.empty() and len(batch) < 500:
+                batch.append(self.outbox.get_nowait())
+            try:
+                replies = await self._pipeline(batch)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, RespError) as e:
+                self.errors += 1
+                self.dropped += len(batch)
+                self._conn = None
+                log.warning("⚠️ Backplane send failed: %s", e)
+                await asyncio.sleep(1)
+                continue
+            failed = [(command, reply) for command, reply in zip(batch, replies) if isinstance(reply, RespError)]
+            self.published += len(batch) - len(failed)
+            if failed:
+                self.rejected += len(failed)
+                command, reply = failed[0]
+                log.warning("⚠️ Backplane: Redis rejected %d of %d commands, e.g. %s: %s",
+                            len(failed), len(batch), command[0], reply)
+
+    async def _pipeline(self, commands):
+        """Write commands back to back, then read their replies in order."""
+        async with self._conn_lock:
+            if self._conn is None:
+                self._conn = await self._open()
+            reader, writer = self._conn
+            writer.write(b"".join(encode_command(*c) for c in commands))
+            await writer.drain()
+            return [await read_reply(reader) for _ in commands]
+
+    def publish_telemetry(self, session, packet, key):
+        self.hub.publish(packet, session, key)
+        self._publish(self.channel(session), {"op": "telemetry", "session": session, "key": key, "packet": packet})
+
+    def student_left(self, session, key):
+        self.hub.forget(session, key)
+        self._publish(self.channel(session), {"op": "left", "session": session, "key": key})
+
+    def invalidate_reports(self, student_ids):
+        report_cache.invalidate(student_ids)
+        self._publish(self.control_channel, {"op": "invalidate", "students": sorted(student_ids)})
+
+    async def student_online(self, student_id, info):
+        await super().student_online(student_id, info)
+        self._send("HSET", self.presence_key, student_id, json.dumps({**info, "node": self.node}))
+
+    async def student_offline(self, student_id):
+        await super().student_offline(student_id)
+        self._send("HDEL", self.presence_key, student_id)
+
+    async def online(self):
+        try:
+            reply = (await self._pipeline([("HGETALL", self.presence_key)]))[0]
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, RespError):
+            self._conn = None
+            return await super().online()
+        if isinstance(reply, RespError):
+            self.rejected += 1
+            log.warning("⚠️ Backplane: Redis rejected HGETALL %s: %s", self.presence_key, reply)
+            return await super().online()
+        pairs = iter(reply or [])
+        return {field.decode(): json.loads(value) for field, value in zip(pairs, pairs)}
+
+    # ---------- Incoming ----------
+    def _room_changed(self, session, active):
+        """The hub gained its first / lost its last teacher in `session`."""
+        channel = self.channel(session)
+        if active:
+            self.channels.add(channel)
+        else:
+            self.channels.discard(channel)
+        if self._sub_writer is not None:
+            self._sub_writer.write(encode_command("SUBSCRIBE" if active else "UNSUBSCRIBE", channel))
+
+    async def _subscriber(self):
+        while True:
+            try:
+                reader, writer = await self._open()
+                self._sub_writer = writer
+                writer.write(encode_command("SUBSCRIBE", *sorted(self.channels)))
+                await writer.drain()
+                self.connected = True
+                while True:
+                    reply = await read_reply(reader)
+                    if isinstance(reply, list) and reply and reply[0] == b"message":
+                        self._dispatch(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                self._sub_writer = None
+                self.errors += 1
+                log.warning("⚠️ Backplane subscriber lost, reconnecting: %s", e)
+                await asyncio.sleep(1)
+
+    def _dispatch(self, data):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if message.get("node") == self.node:
+            return  # already delivered locally
+        self.received += 1
+        op = message.get("op")
+        if op == "telemetry":
+            self.hub.publish(message["packet"], message["session"], message.get("key"))
+        elif op == "left":
+            self.hub.forget(message["session"], message.get("key"))
+        elif op == "invalidate":
+            report_cache.invalidate(message.get("students", []))
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "node": self.node,
+            "connected": self.connected,
+            "channels": len(self.channels),
+            "queue_depth": self.outbox.qsize() if self.outbox else 0,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "rejected": self.rejected,
+        }
+
+
+def create_backplane(url=BACKPLANE_URL, hub=teacher_hub):
+    if not url:
+        return LocalBackplane(hub)
+    if urlparse(url).scheme != "redis":
+        raise ValueError("BACKPLANE_URL must be a redis:// URL")
+    return RedisBackplane(hub, url)
+
+
+backplane = create_backplane()
@@ -0,0 +1,161 @@
+# benchmarks/bench_confusion.py
+"""
+Cost of confusion scoring per face.
+
+    cd Backend
+    python -m benchmarks.bench_confusion                 # 256 synthetic faces
+    python -m benchmarks.bench_confusion --faces 1000 --batch 64
+
+"legacy" is the previous implementation: protobuf attribute access and a
+fresh np.array per distance. "per frame" compares all the landmark work
+of a frame (face box, motion points, gaze, score) on protobufs against the
+same after one landmark_array conversion. The rest work on (478, 3) float32 landmark
+arrays: the single-face wrapper, score_batch over lists of arrays, and
+confusion_scores over one stacked (B, 478, 3) array. Scores are checked
+against the legacy ones first.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ml.confusion import confusion_scores, get_confusion_state, score_batch  # noqa: E402
+from ml.landmarks import NUM_LANDMARKS, landmark_array  # noqa: E402
+from ml.schedule import MOTION_POINTS, landmark_points  # noqa: E402
+
+
+def legacy_dist(a, b):
+    return np.linalg.norm(np.array(a) - np.array(b))
+
+
+def legacy_confusion_state(landmarks, happy_prob):
+    if not landmarks or len(landmarks) < 455:
+        return False, 0.0
+    L_eye, R_eye = landmarks[133], landmarks[362]
+    face_scale = legacy_dist((L_eye.x, L_eye.y), (R_eye.x, R_eye.y))
+    if face_scale == 0:
+        return False, 0.0
+    L_brow, R_brow = landmarks[70], landmarks[300]
+    brow_dist = legacy_dist((L_brow.x, L_brow.y), (R_brow.x, R_brow.y)) / face_scale
+    L_ear, R_ear = landmarks[234], landmarks[454]
+    tilt = abs(L_ear.y - R_ear.y) / face_scale
+    brow_norm = min(brow_dist / 3.5, 1.0)
+    tilt_norm = min(tilt / 0.12, 1.0)
+    happy_norm = max(0.0, min(happy_prob, 1.0))
+    score = 0.45 * (1 - brow_norm) + 0.35 * (1 - happy_norm) + 0.20 * tilt_norm
+    score = float(max(0.0, min(score, 1.0)))
+    return score >= 0.58, score
+
+
+def legacy_frame(face, happy_prob):
+    """Landmark work ProctorEngine + inference did per frame on protobufs."""
+    lm = face.landmark
+    xs, ys = [p.x for p in lm], [p.y for p in lm]
+    box = min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+    points = np.array([(lm[i].x, lm[i].y) for i in MOTION_POINTS], dtype=np.float32)
+    gaze = (lm[1].x, lm[1].y), (lm[33].x, lm[33].y), (lm[263].x, lm[263].y)
+    return box, points, gaze, legacy_confusion_state(lm, happy_prob)
+
+
+def array_frame(face, happy_prob):
+    """The same per-frame work after one landmark_array conversion."""
+    lm = landmark_array(face)
+    (x_min, y_min), (x_max, y_max) = lm[:, :2].min(axis=0).tolist(), lm[:, :2].max(axis=0).tolist()
+    box = x_min, y_min, x_max - x_min, y_max - y_min
+    points = landmark_points(lm)
+    gaze = lm[[1, 33, 263], :2].tolist()
+    return box, points, gaze, get_confusion_state(lm, happy_prob)
+
+
+def synthetic_faces(count, seed=0):
+    """NormalizedLandmarkLists with points scattered over a face-sized region."""
+    rng = np.random.default_rng(seed)
+    faces = []
+    for _ in range(count):
+        center = rng.uniform(0.3, 0.7, size=2)
+        points = np.column_stack([
+            center + rng.normal(0, 0.08, size=(NUM_LANDMARKS, 2)),
+            rng.normal(0, 0.02, size=NUM_LANDMARKS),
+        ])
+        face = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in points:
+            face.landmark.add(x=x, y=y, z=z)
+        faces.append(face)
+    return faces, rng.uniform(0, 1, size=count).tolist()
+
+
+def per_face(fn, faces, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6 / faces)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<36} mean {statistics.mean(samples):8.2f} us/face   p50 {statistics.median(samples):8.2f} us/face")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faces", type=int, default=256)
+    parser.add_argument("--batch", type=int, default=32, help="faces per score_batch / confusion_scores call")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    faces, happy = synthetic_faces(args.faces)
+    arrays = [landmark_array(face) for face in faces]
+    stacked = np.stack(arrays)
+    n, b = args.faces, args.batch
+
+    # ---------- Parity ----------
+    legacy = [legacy_confusion_state(face.landmark, p) for face, p in zip(faces, happy)]
+    new = score_batch(arrays, happy)
+    max_diff = max(abs(a[1] - c[1]) for a, c in zip(legacy, new))
+    flips = sum(a[0] != c[0] for a, c in zip(legacy, new))
+    single = [get_confusion_state(a, p) for a, p in zip(arrays, happy)]
+    print(f"{n} faces, max |score diff| vs legacy {max_diff:.2e}, decision flips {flips}, "
+          f"single-face path {'matches' if single == new else 'DIFFERS FROM'} score_batch\n")
+
+    legacy_frame_us = report("per frame, legacy protobuf access", per_face(
+        lambda: [legacy_frame(f, p) for f, p in zip(faces, happy)], n, args.repeat
+    ))
+    array_frame_us = report("per frame, landmark array", per_face(
+        lambda: [array_frame(f, p) for f, p in zip(faces, happy)], n, args.repeat
+    ))
+    print()
+    legacy_us = report("legacy (protobuf, scalar)", per_face(
+        lambda: [legacy_confusion_state(f.landmark, p) for f, p in zip(faces, happy)], n, args.repeat
+    ))
+    report("landmark_array, point by point", per_face(
+        lambda: [landmark_array(f.landmark) for f in faces], n, args.repeat
+    ))
+    report("landmark_array, serialized list", per_face(
+        lambda: [landmark_array(f) for f in faces], n, args.repeat
+    ))
+    single_us = report("get_confusion_state (array)", per_face(
+        lambda: [get_confusion_state(a, p) for a, p in zip(arrays, happy)], n, args.repeat
+    ))
+    batch_us = report(f"score_batch, {b} per call", per_face(
+        lambda: [score_batch(arrays[i:i + b], happy[i:i + b]) for i in range(0, n, b)], n, args.repeat
+    ))
+    stacked_us = report(f"confusion_scores, ({b}, 478, 3) stacks", per_face(
+        lambda: [confusion_scores(stacked[i:i + b], happy[i:i + b]) for i in range(0, n, b)], n, args.repeat
+    ))
+
+    print(f"\nspeed-up vs legacy: per frame {legacy_frame_us / array_frame_us:.1f}x, "
+          f"scoring only: single {legacy_us / single_us:.1f}x, "
+          f"score_batch {legacy_us / batch_us:.1f}x, stacked {legacy_us / stacked_us:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_preprocess.py
+"""
+Per-frame cost of turning a webcam JPEG into model input.
+
+    cd Backend
+    python -m benchmarks.bench_preprocess                  # synthetic 1280x720 frame
+    python -m benchmarks.bench_preprocess --image me.jpg   # your own frame
+    python -m benchmarks.bench_preprocess --engine         # + full ProctorEngine run
+
+"native" is the old path: full-size decode, then a full-size RGB copy for
+MediaPipe while FER gets the full BGR frame. "prepared" is PreparedFrame:
+reduced-scale decode to the target size and a single RGB conversion shared
+by every model.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ml.preprocess import PreparedFrame  # noqa: E402
+
+
+def synthetic_jpeg(width=1280, height=720):
+    y, x = np.mgrid[0:height, 0:width]
+    img = np.dstack([(x * 255 // width), (y * 255 // height), ((x + y) % 256)]).astype(np.uint8)
+    cv2.circle(img, (width // 2, height // 2), height // 4, (200, 170, 150), -1)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    return buf.tobytes()
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name, samples):
+    print(f"{name:<28} mean {statistics.mean(samples):7.2f} ms   p50 {statistics.median(samples):7.2f} ms")
+    return statistics.mean(samples)
+
+
+def native_path(jpeg):
+    bgr = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    return bgr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="JPEG/PNG frame to use instead of a synthetic one")
+    parser.add_argument("--size", type=int, default=640, help="target long side for every model")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--engine", action="store_true", help="also time ProctorEngine.process_frame")
+    args = parser.parse_args()
+
+    if args.image:
+        img = cv2.imread(args.image)
+        jpeg = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes()
+    else:
+        jpeg = synthetic_jpeg()
+    sizes = {"detection": args.size, "mesh": args.size, "fer": args.size}
+
+    h, w = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape[:2]
+    print(f"frame {w}x{h}, {len(jpeg) // 1024} KB JPEG, target long side {args.size}px\n")
+
+    native = report("native decode + RGB", timed(lambda: native_path(jpeg), args.repeat))
+    prepared = report("prepared (reduced decode)", timed(
+        lambda: PreparedFrame.from_jpeg(jpeg, 0, sizes), args.repeat
+    ))
+    print(f"\npreprocessing saving: {native - prepared:.2f} ms/frame ({(1 - prepared / native) * 100:.0f}%)")
+
+    if args.engine:
+        from ml.proctor import ProctorEngine
+
+        repeat = max(10, args.repeat // 10)
+        engine = ProctorEngine()
+        print()
+        native = report("engine, native frame", timed(
+            lambda: engine.process_frame(native_path(jpeg)), repeat
+        ))
+        engine.reset()
+        prepared = report("engine, prepared frame", timed(
+            lambda: engine.process_frame(PreparedFrame.from_jpeg(jpeg, 0, sizes)), repeat
+        ))
+        print(f"\nend-to-end saving: {native - prepared:.2f} ms/frame ({(1 - prepared / native) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
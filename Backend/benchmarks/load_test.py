@@ -0,0 +1,387 @@
+# benchmarks/load_test.py
+"""
+Capacity test: N simulated students stream frames to /ws/student while M
+teacher sockets time each frame from its capture timestamp until its
+telemetry arrives.
+
+    cd Backend
+    python -m benchmarks.load_test --students 20 --teachers 2 --fps 5 --duration 30
+    python -m benchmarks.load_test --video class.mp4 --students 40
+    python -m benchmarks.load_test --url http://localhost:8000 --server-pid 1234
+
+Without --url the app runs inside this process: uvicorn on a free port, a
+throw-away SQLite database, and INFERENCE_WORKERS / ENGINES_PER_WORKER
+taken from the environment. No external services are needed. The clients
+then share the server's event loop, so compare in-process runs with each
+other, not with a deployed server.
+
+Every simulated student registers (or reuses) its own account, logs in
+through /login and sends the cookie it gets back. Frames come from --video
+(looped), from --images, or from synthetic frames that change every time,
+so the change detector can't skip them. Synthetic frames are not real
+faces, so their model cost is not representative. Use a recording of real
+students to measure it.
+
+Reported: frames sent and the teachers' telemetry rate. End-to-end latency
+p50/p95/p99 is from capture_ts to the teacher receiving it. Frame outcomes
+and mean stage times come from the /metrics deltas. Server CPU comes from
+psutil: the server process plus its inference workers. With --url, CPU is
+only measured when you pass --server-pid for a server on this host.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import httpx
+import numpy as np
+import websockets
+from prometheus_client.parser import text_string_to_metric_families
+
+try:
+    import psutil
+except ImportError:  # CPU figures are skipped
+    psutil = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from protocol import pack_frame  # noqa: E402
+
+PASSWORD = "loadtest"
+
+
+# ---------- FIXTURES ----------
+def encode(img, width, quality):
+    h, w = img.shape[:2]
+    if width and w > width:
+        img = cv2.resize(img, (width, h * width // w), interpolation=cv2.INTER_AREA)
+    return cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def video_frames(path, width, quality, limit):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, img = capture.read()
+        if not ok:
+            break
+        frames.append(encode(img, width, quality))
+    capture.release()
+    return frames
+
+
+def image_frames(pattern, width, quality, limit):
+    paths = sorted(glob.glob(os.path.join(pattern, "*")) if os.path.isdir(pattern) else glob.glob(pattern))
+    images = (cv2.imread(p) for p in paths[:limit])
+    return [encode(img, width, quality) for img in images if img is not None]
+
+
+def synthetic_frames(width, quality, count):
+    """A face-sized blob drifting over a scrolling gradient; no two frames alike."""
+    height = width * 3 // 4
+    y, x = np.mgrid[0:height, 0:width]
+    background = np.dstack([x * 255 // width, y * 255 // height, (x + y) % 256]).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        img = np.roll(background, i * width // count, axis=1)
+        cx = int(width / 2 + width / 6 * np.sin(2 * np.pi * i / count))
+        cy = int(height / 2 + height / 8 * np.cos(2 * np.pi * i / count))
+        cv2.ellipse(img, (cx, cy), (height // 6, height // 4), 0, 0, 360, (150, 170, 200), -1)
+        for dx in (-1, 1):
+            cv2.circle(img, (cx + dx * height // 14, cy - height // 16), height // 40, (40, 40, 40), -1)
+        frames.append(encode(img, width, quality))
+    # Consecutive frames far apart in the cycle: every one passes CHANGE_THRESHOLD
+    np.random.default_rng(0).shuffle(frames)
+    return frames
+
+
+# ---------- SERVER ----------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_in_process_server(workdir):
+    # Set before main.py (and database.py) are imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    import uvicorn
+    import main as app_main
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def scrape(client):
+    """Flat {(sample name, labels): value} view of /metrics."""
+    r = await client.get("/metrics")
+    r.raise_for_status()
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(r.text)
+        for sample in family.samples
+    }
+
+
+def cpu_seconds(proc):
+    """User + system CPU of a process and its children (inference workers)."""
+    total = 0.0
+    for p in [proc] + proc.children(recursive=True):
+        try:
+            times = p.cpu_times()
+            total += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+# ---------- CLIENTS ----------
+async def login(client, role, index):
+    email = f"loadtest-{role}-{index}@loadtest.local"
+    # 400 = already registered by an earlier run against the same database
+    await client.post("/register", json={"name": f"Load {role} {index}", "email": email, "password": PASSWORD, "role": role})
+    r = await client.post("/login", data={"username": email, "password": PASSWORD})
+    r.raise_for_status()
+    return r.cookies["access_token"]
+
+
+class Results:
+    def __init__(self):
+        self.sent = 0
+        self.rejected = 0
+        self.received = 0
+        self.latencies_ms = []
+
+
+async def run_student(token, ws_url, index, frames, args, results, stop_at):
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / args.fps
+    try:
+        async with websockets.connect(
+            ws_url + "/ws/student", additional_headers={"Cookie": f"access_token={token}"}
+        ) as ws:
+            if args.session:
+                await ws.send(json.dumps({"type": "init", "session_id": args.session}))
+            # Students start spread over one frame interval, like a real class
+            next_at = loop.time() + interval * index / args.students
+            seq = 0
+            while True:
+                await asyncio.sleep(max(0.0, next_at - loop.time()))
+                if loop.time() >= stop_at:
+                    return
+                jpeg = frames[(index * 7 + seq) % len(frames)]
+                await ws.send(pack_frame(jpeg, seq, int(time.time() * 1000)))
+                results.sent += 1
+                seq += 1
+                next_at += interval
+    except websockets.ConnectionClosed as e:
+        # 1013: no free inference engine within LEASE_TIMEOUT
+        if e.rcvd is not None and e.rcvd.code == 1013:
+            results.rejected += 1
+        else:
+            raise
+
+
+async def run_teacher(client, ws_url, index, args, results, ready):
+    token = await login(client, "teacher", index)
+    async with websockets.connect(
+        ws_url + "/ws/teacher", additional_headers={"Cookie": f"access_token={token}"}, max_size=None
+    ) as ws:
+        if args.session or args.mode != "stream":
+            sessions = [args.session] if args.session else []
+            await ws.send(json.dumps({"type": "subscribe", "sessions": sessions, "mode": args.mode}))
+        ready.set()
+        async for message in ws:
+            now_ms = time.time() * 1000
+            packet = json.loads(message)
+            if packet.get("type") == "telemetry":
+                updates = [packet["data"]]
+            elif packet.get("type") == "snapshot":
+                updates = packet["students"].values()
+            else:
+                continue
+            for t in updates:
+                results.received += 1
+                if t.get("capture_ts"):
+                    results.latencies_ms.append(now_ms - t["capture_ts"])
+
+
+# ---------- REPORT ----------
+def percentiles(samples):
+    if len(samples) < 2:
+        return {}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98], "max": max(samples)}
+
+
+def metric_deltas(before, after):
+    frames, stages = {}, {}
+    for (name, labels), value in after.items():
+        delta = value - before.get((name, labels), 0.0)
+        labels = dict(labels)
+        if name == "smartsession_frames_total":
+            frames[labels["outcome"]] = int(delta)
+        elif name == "smartsession_stage_seconds_count" and delta:
+            total = after[("smartsession_stage_seconds_sum", (("stage", labels["stage"]),))]
+            total -= before.get(("smartsession_stage_seconds_sum", (("stage", labels["stage"]),)), 0.0)
+            stages[labels["stage"]] = {"count": int(delta), "mean_ms": total / delta * 1000}
+    return frames, stages
+
+
+def print_report(summary):
+    print(f"\n{summary['students']} students x {summary['fps']} fps, {summary['teachers']} teachers, "
+          f"{summary['duration']:.1f}s")
+    print(f"frames sent        {summary['frames_sent']:8d}   ({summary['send_rate']:.1f}/s)")
+    if summary["rejected_students"]:
+        print(f"students rejected  {summary['rejected_students']:8d}   (no free engine)")
+    print(f"telemetry received {summary['telemetry_received']:8d}   ({summary['telemetry_rate']:.1f}/s per teacher)")
+
+    latency = summary["latency_ms"]
+    if latency:
+        print("capture -> teacher " + "   ".join(f"{k} {v:7.1f} ms" for k, v in latency.items()))
+    else:
+        print("capture -> teacher  no samples")
+
+    frames = summary["frames"]
+    if frames:
+        print("server frames      " + "   ".join(f"{k} {v}" for k, v in frames.items()))
+        received = frames.get("received", 0)
+        if received:
+            print(f"dropped            {frames.get('dropped', 0) / received * 100:7.1f} %")
+    for stage, s in summary["stages"].items():
+        print(f"  {stage:<16} {s['mean_ms']:8.2f} ms mean   x{s['count']}")
+
+    if summary.get("server_cpu_percent") is not None:
+        print(f"server CPU         {summary['server_cpu_percent']:7.1f} %   "
+              f"(100 % = one core; cores: {summary['cpu_count']})")
+
+
+# ---------- MAIN ----------
+async def run(args):
+    if args.video:
+        frames = video_frames(args.video, args.width, args.quality, args.max_frames)
+    elif args.images:
+        frames = image_frames(args.images, args.width, args.quality, args.max_frames)
+    else:
+        frames = synthetic_frames(args.width, args.quality, args.max_frames)
+    if not frames:
+        sys.exit("No frames could be read from the fixture")
+    print(f"{len(frames)} fixture frames, avg {sum(map(len, frames)) // len(frames) // 1024} KB")
+
+    server = task = workdir = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        server_proc = psutil.Process(args.server_pid) if psutil and args.server_pid else None
+    else:
+        workdir = tempfile.TemporaryDirectory(prefix="smartsession-loadtest-")
+        server, task, base_url = await start_in_process_server(workdir.name)
+        server_proc = psutil.Process() if psutil else None
+    ws_url = "ws" + base_url[len("http"):]
+
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            results = Results()
+            ready = [asyncio.Event() for _ in range(args.teachers)]
+            teachers = [
+                asyncio.create_task(run_teacher(client, ws_url, i, args, results, ready[i]))
+                for i in range(args.teachers)
+            ]
+            await asyncio.wait_for(asyncio.gather(*(r.wait() for r in ready)), 30)
+            tokens = await asyncio.gather(*(login(client, "student", i) for i in range(args.students)))
+
+            before = await scrape(client)
+            cpu_before = cpu_seconds(server_proc) if server_proc else None
+            started = time.perf_counter()
+            stop_at = asyncio.get_running_loop().time() + args.duration
+            await asyncio.gather(*(
+                run_student(token, ws_url, i, frames, args, results, stop_at) for i, token in enumerate(tokens)
+            ))
+            streamed = time.perf_counter() - started
+            await asyncio.sleep(args.drain)  # in-flight frames and queued telemetry
+            elapsed = time.perf_counter() - started
+            cpu_after = cpu_seconds(server_proc) if server_proc else None
+            after = await scrape(client)
+
+            for t in teachers:
+                t.cancel()
+            await asyncio.gather(*teachers, return_exceptions=True)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await task
+            workdir.cleanup()
+
+    frames_by_outcome, stages = metric_deltas(before, after)
+    summary = {
+        "students": args.students,
+        "teachers": args.teachers,
+        "fps": args.fps,
+        "duration": streamed,
+        "frames_sent": results.sent,
+        "send_rate": results.sent / streamed,
+        "rejected_students": results.rejected,
+        "telemetry_received": results.received,
+        "telemetry_rate": results.received / streamed / max(args.teachers, 1),
+        "latency_ms": percentiles(results.latencies_ms),
+        "frames": frames_by_outcome,
+        "stages": stages,
+        "server_cpu_percent": (cpu_after - cpu_before) / elapsed * 100 if server_proc else None,
+        "cpu_count": os.cpu_count(),
+    }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server, e.g. http://localhost:8000 (default: start one in-process)")
+    parser.add_argument("--server-pid", type=int, help="with --url: server process to measure CPU of")
+    parser.add_argument("--students", type=int, default=10)
+    parser.add_argument("--teachers", type=int, default=1)
+    parser.add_argument("--fps", type=float, default=5.0, help="frames per second per student")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of streaming")
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for late telemetry")
+    parser.add_argument("--session", help="class session the students join and the teachers subscribe to")
+    parser.add_argument("--mode", choices=("stream", "snapshot"), default="stream", help="teacher delivery mode")
+    parser.add_argument("--video", help="video file to replay (frames are looped)")
+    parser.add_argument("--images", help="directory or glob of still frames to replay")
+    parser.add_argument("--width", type=int, default=640, help="frame width sent, like the browser capture")
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    parser.add_argument("--max-frames", type=int, default=300, help="fixture frames kept in memory")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if p95 latency is above this")
+    args = parser.parse_args()
+    if psutil is None:
+        print("psutil not installed, server CPU is not measured")
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request otherwise
+
+    summary = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+    if args.max_p95_ms is not None:
+        p95 = summary["latency_ms"].get("p95")
+        if p95 is None or p95 > args.max_p95_ms:
+            print(f"FAIL: p95 latency {p95} ms exceeds {args.max_p95_ms} ms")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
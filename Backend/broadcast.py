@@ -0,0 +1,332 @@
+# broadcast.py
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import metrics
+
+log = logging.getLogger("smartsession")
+
+# Outgoing messages waiting per teacher before the slow-consumer policy applies
+TEACHER_QUEUE_SIZE = int(os.getenv("TEACHER_QUEUE_SIZE", 64))
+# coalesce: a newer packet for the same student replaces the queued one,
+#           then the oldest packet is dropped when full
+# drop_oldest: keep every packet, drop the oldest when full
+# disconnect: close a teacher whose queue fills up (the client reconnects)
+TEACHER_SLOW_POLICY = os.getenv("TEACHER_SLOW_POLICY", "coalesce")
+# A send that takes longer than this means the connection is dead
+TEACHER_SEND_TIMEOUT = float(os.getenv("TEACHER_SEND_TIMEOUT", 5))
+
+# Snapshot-mode teachers get one combined update per tick ...
+SNAPSHOT_HZ = float(os.getenv("SNAPSHOT_HZ", 4))
+# ... and a full keyframe every N ticks so clients can resync
+SNAPSHOT_KEYFRAME_EVERY = int(os.getenv("SNAPSHOT_KEYFRAME_EVERY", 20))
+
+# Session students and teachers are in until they say otherwise
+DEFAULT_SESSION = os.getenv("DEFAULT_SESSION", "default")
+
+POLICIES = ("coalesce", "drop_oldest", "disconnect")
+if TEACHER_SLOW_POLICY not in POLICIES:
+    raise ValueError(f"TEACHER_SLOW_POLICY must be one of {', '.join(POLICIES)}")
+
+
+def session_key(value):
+    """Session ID as sent by a client -> the room name it maps to."""
+    if value is None:
+        return DEFAULT_SESSION
+    return str(value).strip()[:64] or DEFAULT_SESSION
+
+
+def snapshot_fields(packet):
+    """Flat per-student state kept for snapshots: the telemetry plus who and where."""
+    return {
+        "student_name": packet.get("student_name"),
+        "session_id": packet.get("session_id"),
+        **packet.get("data", {}),
+    }
+
+
+class TeacherChannel:
+    """
+    One teacher socket: a bounded queue of already-serialized messages and
+    the task that drains it. Publishing never waits on the socket.
+
+    In "stream" mode every telemetry packet is queued; in "snapshot" mode the
+    hub's ticker queues one delta per tick against `view`, the state this
+    teacher was last sent.
+    """
+
+    def __init__(self, websocket, channel_id, max_size=TEACHER_QUEUE_SIZE, policy=TEACHER_SLOW_POLICY):
+        self.websocket = websocket
+        self.id = channel_id
+        self.max_size = max_size
+        self.policy = policy
+        self.sessions = set()
+        self.mode = "stream"
+        self.view = {}  # snapshot mode: student key -> state last sent
+        self.needs_keyframe = True
+        self.ticks_since_keyframe = 0
+        self.dropped_at_keyframe = 0
+        self.pending = OrderedDict()  # key -> text
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.task = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.snapshots = 0
+        self.keyframes = 0
+        self.snapshots_skipped = 0
+        self.send_ms_total = 0.0
+        self.last_send_ms = 0.0
+        self.max_send_ms = 0.0
+        self.max_depth = 0
+
+    def put(self, text, key=None):
+        if self.closed:
+            return
+        if self.policy == "coalesce" and key is not None and key in self.pending:
+            self.pending[key] = text  # keeps its place in line, carries the newest data
+            self.coalesced += 1
+            return
+
+        if len(self.pending) >= self.max_size:
+            if self.policy == "disconnect":
+                print(f"🐢 Teacher {self.id} can't keep up, disconnecting")
+                self.close()
+                return
+            self.pending.popitem(last=False)
+            self.dropped += 1
+            metrics.TEACHER_MESSAGES_DROPPED.inc()
+
+        if self.policy != "coalesce" or key is None:
+            key = ("seq", next(self._seq))
+        self.pending[key] = text
+        self.max_depth = max(self.max_depth, len(self.pending))
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self.pending.clear()
+        self._ready.set()
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+        # Ends the teacher's receive loop, which unregisters the channel
+        asyncio.ensure_future(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    async def run(self):
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.pending and not self.closed:
+                _key, text = self.pending.popitem(last=False)
+                started = time.perf_counter()
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(text), TEACHER_SEND_TIMEOUT)
+                except Exception as e:
+                    log.warning("Send to teacher %s failed: %s", self.id, str(e) or type(e).__name__)
+                    self.close()
+                    return
+                elapsed = time.perf_counter() - started
+                metrics.observe("teacher_send", elapsed)
+                elapsed *= 1000
+                self.sent += 1
+                self.send_ms_total += elapsed
+                self.last_send_ms = elapsed
+                self.max_send_ms = max(self.max_send_ms, elapsed)
+
+    def stats(self):
+        return {
+            "teacher": self.id,
+            "sessions": sorted(self.sessions),
+            "mode": self.mode,
+            "queue_depth": len(self.pending),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "snapshots": self.snapshots,
+            "keyframes": self.keyframes,
+            "snapshots_skipped": self.snapshots_skipped,
+            "avg_send_ms": round(self.send_ms_total / self.sent, 2) if self.sent else 0.0,
+            "last_send_ms": round(self.last_send_ms, 2),
+            "max_send_ms": round(self.max_send_ms, 2),
+        }
+
+
+class BroadcastHub:
+    """
+    Routes packets to the teacher channels subscribed to a session. Teachers
+    start in DEFAULT_SESSION, where students without a session ID also land.
+    The latest state of every student is kept per session for snapshot-mode
+    teachers, which a single ticker task serves.
+    """
+
+    def __init__(self):
+        self.channels = {}  # websocket -> TeacherChannel
+        self.rooms = {}     # session ID -> set of TeacherChannel
+        self.latest = {}    # session ID -> {student key -> snapshot state}
+        self.tick = 0
+        self._ticker = None
+        self.room_listener = None  # called as (session, active) when a room opens / empties
+        self._ids = itertools.count(1)
+
+    def add(self, websocket):
+        channel = TeacherChannel(websocket, next(self._ids))
+        channel.task = asyncio.create_task(channel.run())
+        self.channels[websocket] = channel
+        self.subscribe(websocket, [DEFAULT_SESSION])
+        return channel
+
+    def subscribe(self, websocket, sessions, mode="stream"):
+        """Replace a teacher's subscriptions; returns the session IDs now subscribed."""
+        channel = self.channels[websocket]
+        self._leave_rooms(channel)
+        channel.sessions = {session_key(s) for s in sessions} or {DEFAULT_SESSION}
+        for session in channel.sessions:
+            if session not in self.rooms:
+                self.rooms[session] = set()
+                if self.room_listener:
+                    self.room_listener(session, True)
+            self.rooms[session].add(channel)
+
+        channel.mode = "snapshot" if mode == "snapshot" else "stream"
+        channel.view = {}
+        channel.needs_keyframe = True
+        if channel.mode == "snapshot" and self._ticker is None:
+            self._ticker = asyncio.create_task(self._tick_loop())
+        return sorted(channel.sessions)
+
+    def _leave_rooms(self, channel):
+        for session in channel.sessions:
+            members = self.rooms.get(session)
+            if members is not None:
+                members.discard(channel)
+                if not members:
+                    del self.rooms[session]
+                    if self.room_listener:
+                        self.room_listener(session, False)
+        channel.sessions = set()
+
+    async def remove(self, websocket):
+        channel = self.channels.pop(websocket, None)
+        if channel is None:
+            return
+        self._leave_rooms(channel)
+        channel.closed = True
+        channel.task.cancel()
+        await asyncio.gather(channel.task, return_exceptions=True)
+
+    def publish(self, packet, session=DEFAULT_SESSION, key=None):
+        """
+        Serialize once and queue for every teacher in `session`; `key` groups
+        packets that may be coalesced.
+        """
+        if key is not None:
+            self.latest.setdefault(session, {})[key] = snapshot_fields(packet)
+
+        text = None
+        for channel in list(self.rooms.get(session, ())):
+            if channel.mode != "stream":
+                continue  # picked up by the next snapshot tick
+            if text is None:
+                text = json.dumps(packet)
+            channel.put(text, key)
+
+    def forget(self, session, key):
+        """A student left `session`; snapshot teachers see it in `removed`."""
+        students = self.latest.get(session)
+        if students is not None:
+            students.pop(key, None)
+            if not students:
+                del self.latest[session]
+
+    # ---------- Snapshots ----------
+    async def _tick_loop(self):
+        interval = 1 / SNAPSHOT_HZ
+        while True:
+            await asyncio.sleep(interval)
+            self.tick += 1
+            for channel in list(self.channels.values()):
+                if channel.mode == "snapshot" and not channel.closed:
+                    self._send_snapshot(channel)
+
+    def _send_snapshot(self, channel):
+        # The last one hasn't gone out yet: skip this tick, the next delta
+        # covers both because `view` only advances when a snapshot is queued
+        if channel.pending:
+            channel.snapshots_skipped += 1
+            return
+
+        current = {}
+        for session in channel.sessions:
+            current.update(self.latest.get(session, {}))
+
+        keyframe = (
+            channel.needs_keyframe
+            or channel.ticks_since_keyframe + 1 >= SNAPSHOT_KEYFRAME_EVERY
+            or channel.dropped != channel.dropped_at_keyframe  # a delta was lost
+        )
+        if keyframe:
+            students, removed = current, []
+        else:
+            students = {}
+            for key, state in current.items():
+                old = channel.view.get(key)
+                changed = state if old is None else {f: v for f, v in state.items() if old.get(f) != v}
+                if changed:
+                    students[key] = changed
+            removed = [key for key in channel.view if key not in current]
+            channel.ticks_since_keyframe += 1
+            if not students and not removed:
+                return
+
+        # States are replaced, never mutated, on publish; a shallow copy is enough
+        channel.view = dict(current)
+        if keyframe:
+            channel.needs_keyframe = False
+            channel.ticks_since_keyframe = 0
+            channel.dropped_at_keyframe = channel.dropped
+            channel.keyframes += 1
+        channel.snapshots += 1
+        channel.put(json.dumps({
+            "type": "snapshot",
+            "keyframe": keyframe,
+            "tick": self.tick,
+            "timestamp": int(time.time() * 1000),
+            "students": {str(key): state for key, state in students.items()},
+            "removed": [str(key) for key in removed],
+        }))
+
+    async def stop(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+            self._ticker = None
+
+    def send_to(self, websocket, packet):
+        """Queue a message for one teacher, behind what is already waiting."""
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.put(json.dumps(packet))
+
+    def __len__(self):
+        return len(self.channels)
+
+    def stats(self):
+        return [channel.stats() for channel in self.channels.values()]
+
+
+teacher_hub = BroadcastHub()
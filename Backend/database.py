@@ -1,36 +1,123 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-
-# Use DATABASE_URL from environment in production, else fallback to SQLite
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
-
-# Fix for Railway/Render postgres URLs (they start with postgres://)
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-
-# SQLite needs special config
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-    pool_pre_ping=True
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-# --- ADD THIS FUNCTION ---
-def get_db():
-    """
-    FastAPI dependency to get a database session
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+import os
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+# Use DATABASE_URL from environment in production, else fallback to SQLite
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+# Fix for Railway/Render postgres URLs (they start with postgres://)
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# How long a SQLite writer waits on a locked database before giving up
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+# How long a starting process waits for another one's migrations (SQLite)
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", 600000))
+# pg_advisory_xact_lock key shared by every process migrating this database
+SCHEMA_LOCK_KEY = 0x53534D47
+
+
+def async_url(url: str) -> str:
+    """Same database, async driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    scheme, rest = url.split("://", 1)
+    if "+" in scheme:  # explicit driver, e.g. postgresql+psycopg2
+        scheme = scheme.split("+", 1)[0]
+    driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}.get(scheme, scheme)
+    return f"{driver}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", async_url(DATABASE_URL))
+
+# SQLite needs special config
+connect_args = {}
+if IS_SQLITE:
+    connect_args = {"check_same_thread": False}
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    pool_pre_ping=True
+)
+
+# Used by the WebSocket handlers, the report routes and the telemetry writer
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
+
+# ---------- SQLite tuning ----------
+def _sqlite_pragmas(dbapi_conn, _record):
+    """
+    WAL lets readers (reports) run while the telemetry writer commits, and
+    synchronous=NORMAL is safe under WAL. busy_timeout makes a second writer
+    wait for the lock instead of failing straight away with "database is locked".
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+if IS_SQLITE and ":memory:" not in DATABASE_URL:
+    event.listen(engine, "connect", _sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+# ---------- Schema lock ----------
+@contextmanager
+def schema_lock(bind=None):
+    """
+    A sync connection inside a transaction that holds a database-wide lock
+    until it commits, so concurrent server processes (uvicorn --workers)
+    migrate and rebuild rollups one at a time. Postgres: a transaction-level
+    advisory lock. SQLite: BEGIN IMMEDIATE, i.e. the database write lock.
+    """
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        with bind.begin() as conn:
+            if bind.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            yield conn
+        return
+
+    # pysqlite would start a deferred transaction on its own; take the write lock up front
+    with bind.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.exec_driver_sql(f"PRAGMA busy_timeout={MIGRATION_LOCK_TIMEOUT_MS}")
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+            conn.exec_driver_sql("COMMIT")
+        finally:
+            conn.exec_driver_sql(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+Base = declarative_base()
+
+# --- ADD THIS FUNCTION ---
+def get_db():
+    """
+    FastAPI dependency to get a database session
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency to get an async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
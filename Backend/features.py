@@ -0,0 +1,146 @@
+# features.py
+"""
+Per-student temporal signals, updated in O(1) per frame on the student's
+socket: the smoothed confusion score, gaze / absence durations and the
+violation timer, exponential moving averages over several time windows,
+and session-wide ratios. The same values go out with the live telemetry
+and into the stored rows, so reports never have to recompute them.
+"""
+import math
+import os
+
+# Frames averaged into smoothed_confusion
+SMOOTHING_WINDOW = int(os.getenv("SMOOTHING_WINDOW", 8))
+# Time constants (seconds) of the moving averages sent with telemetry
+FEATURE_EMA_WINDOWS = [int(w) for w in os.getenv("FEATURE_EMA_WINDOWS", "10,60,300").split(",") if w.strip()]
+# Looking away in one direction longer than this is a gaze violation
+GAZE_VIOLATION_SECONDS = float(os.getenv("GAZE_VIOLATION_SECONDS", 4))
+# Longer gaps between frames (camera paused, tab hidden) only count this much
+MAX_FRAME_GAP = 5.0
+
+
+class RingMean:
+    """Mean of the last `size` values, in O(1) per push."""
+
+    __slots__ = ("values", "size", "pos", "count", "total")
+
+    def __init__(self, size):
+        self.size = max(1, size)
+        self.values = [0.0] * self.size
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value):
+        if self.count == self.size:
+            self.total -= self.values[self.pos]
+        else:
+            self.count += 1
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.pos == 0:
+            # Once per lap, so float error from the running sum never builds up
+            self.total = math.fsum(self.values[:self.count])
+        else:
+            self.total += value
+        return self.total / self.count
+
+
+class StudentFeatures:
+    """
+    Temporal state for ONE student, created with the socket. `update()` takes
+    one frame's result and returns the features for it.
+
+    Durations and ratios count the time since the previous frame towards the
+    state that previous frame reported; gaps longer than MAX_FRAME_GAP are
+    cut short. The gaze timer only advances while the
+    face is tracked, like the per-engine timer it replaces.
+    """
+
+    __slots__ = (
+        "smoothing", "windows", "ema_confusion", "ema_away", "ema_absent",
+        "last_ts", "active_seconds", "frames",
+        "away_since", "away_direction", "absent_since", "confused_since",
+        "away_seconds", "absent_seconds", "was_away", "was_absent",
+    )
+
+    def __init__(self, smoothing_window=SMOOTHING_WINDOW, ema_windows=FEATURE_EMA_WINDOWS):
+        self.smoothing = RingMean(smoothing_window)
+        self.windows = list(ema_windows)
+        self.ema_confusion = [0.0] * len(self.windows)
+        self.ema_away = [0.0] * len(self.windows)
+        self.ema_absent = [0.0] * len(self.windows)
+        self.last_ts = None
+        self.active_seconds = 0.0
+        self.frames = 0
+        self.away_since = None
+        self.away_direction = None
+        self.absent_since = None
+        self.confused_since = None
+        self.away_seconds = 0.0
+        self.absent_seconds = 0.0
+        self.was_away = False
+        self.was_absent = False
+
+    def update(self, now, face_count, gaze, tracked, confusion_score, confused):
+        """`now` in seconds; returns this frame's features as a dict."""
+        first = self.last_ts is None
+        dt = 0.0 if first else min(max(now - self.last_ts, 0.0), MAX_FRAME_GAP)
+        self.last_ts = now
+        self.frames += 1
+        self.active_seconds += dt
+
+        # ---------- DURATIONS ----------
+        if self.was_away:
+            self.away_seconds += dt
+        if self.was_absent:
+            self.absent_seconds += dt
+
+        absent = face_count == 0
+        if not absent:
+            self.absent_since = None
+        elif self.absent_since is None:
+            self.absent_since = now
+
+        if tracked:
+            if gaze == "CENTER":
+                self.away_since = self.away_direction = None
+            elif gaze != self.away_direction:
+                self.away_since, self.away_direction = now, gaze
+        # An untracked frame keeps the timer where it was but isn't "away"
+        away = tracked and self.away_since is not None
+
+        if not confused:
+            self.confused_since = None
+        elif self.confused_since is None:
+            self.confused_since = now
+
+        self.was_away, self.was_absent = away, absent
+
+        # ---------- MOVING AVERAGES ----------
+        smoothed = self.smoothing.push(confusion_score)
+        for i, window in enumerate(self.windows):
+            # Time-based, so the averages mean the same at any frame rate
+            alpha = 1.0 if first else 1.0 - math.exp(-dt / window)
+            self.ema_confusion[i] += alpha * (confusion_score - self.ema_confusion[i])
+            self.ema_away[i] += alpha * (away - self.ema_away[i])
+            self.ema_absent[i] += alpha * (absent - self.ema_absent[i])
+
+        gaze_away_for = now - self.away_since if away else 0.0
+        active = self.active_seconds
+        return {
+            "smoothed_confusion": smoothed,
+            "gaze_away_seconds": round(gaze_away_for, 2),
+            "gaze_violation": gaze_away_for > GAZE_VIOLATION_SECONDS,
+            "face_absent_seconds": round(now - self.absent_since, 2) if absent else 0.0,
+            "confused_seconds": round(now - self.confused_since, 2) if confused else 0.0,
+            "confusion_ema": self._by_window(self.ema_confusion),
+            "away_ratio_ema": self._by_window(self.ema_away),
+            "absent_ratio_ema": self._by_window(self.ema_absent),
+            "away_ratio": round(self.away_seconds / active, 3) if active else 0.0,
+            "absent_ratio": round(self.absent_seconds / active, 3) if active else 0.0,
+            "fps": round((self.frames - 1) / active, 2) if active else 0.0,
+        }
+
+    def _by_window(self, values):
+        return {f"{w}s": round(v, 3) for w, v in zip(self.windows, values)}
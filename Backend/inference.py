@@ -0,0 +1,324 @@
+# inference.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+
+from ml.change import ChangeDetector, jpeg_thumbnail
+from ml.confusion import get_confusion_state
+from ml.preprocess import PreparedFrame
+from ml.schedule import STAGES, STAGE_FIELDS, parse_schedule
+from landmark_archive import ARCHIVE_DIR, compact_frame
+
+log = logging.getLogger("smartsession")
+
+# Number of inference processes. Each one loads its own MediaPipe + FER models.
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+
+# ProctorEngine instances per worker process = max students per worker
+ENGINES_PER_WORKER = int(os.getenv("ENGINES_PER_WORKER", 8))
+
+# How long a new student waits for a free engine before being turned away
+LEASE_TIMEOUT = float(os.getenv("LEASE_TIMEOUT", 10))
+
+# Frames whose thumbnail changed less than this (mean abs diff, 0..1) reuse
+# the previous result. 0 disables the change detector.
+CHANGE_THRESHOLD = float(os.getenv("CHANGE_THRESHOLD", 0.02))
+
+# Run the full models at least once every N frames even if nothing changed
+FORCE_REFRESH_EVERY = int(os.getenv("FORCE_REFRESH_EVERY", 10))
+
+# Which models run on which frames: each stage runs every Nth analysed frame
+STAGE_SCHEDULE = parse_schedule(os.getenv("STAGE_SCHEDULE", "detection=1,mesh=1,fer=4"))
+
+# FER also runs early when the face moved this much (eye-distance units) since its last run
+FER_MOTION_THRESHOLD = float(os.getenv("FER_MOTION_THRESHOLD", 0.15))
+
+# Longest image side (px) each model is fed; 0 = camera resolution.
+# The frame is decoded once at the largest of these.
+INFER_SIZES = {
+    "detection": int(os.getenv("INFER_SIZE_DETECTION", 640)),
+    "mesh": int(os.getenv("INFER_SIZE_MESH", 640)),
+    "fer": int(os.getenv("INFER_SIZE_FER", 640)),
+}
+
+
+# --- Worker process side ---
+class EngineSlot:
+    """Everything one student's frames need inside a worker process."""
+
+    def __init__(self):
+        from ml.proctor import ProctorEngine
+        self.engine = ProctorEngine(STAGE_SCHEDULE, FER_MOTION_THRESHOLD)
+        self.change = ChangeDetector(CHANGE_THRESHOLD, FORCE_REFRESH_EVERY)
+        self.last_result = None
+
+    def reset(self):
+        self.engine.reset()
+        self.change.reset()
+        self.last_result = None
+
+    def reuse_last(self):
+        """Previous result for a near-duplicate frame."""
+        proctor_data = dict(self.last_result)
+        proctor_data["reused"] = True
+        proctor_data["timings"] = {}
+        proctor_data["stages"] = []
+        proctor_data["carried_forward"] = [f for stage in STAGES for f in STAGE_FIELDS[stage]]
+        return proctor_data
+
+
+# Filled by _init_worker inside each child process, never in the server process.
+_slots: Dict[int, EngineSlot] = {}
+
+
+def _init_worker(slots):
+    # Spawned workers don't inherit main.py's logging setup
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    for slot in range(slots):
+        _slots[slot] = EngineSlot()
+
+
+def _warmup():
+    return os.getpid()
+
+
+def _release_engine(slot):
+    _slots[slot].reset()
+
+
+def _run_inference(slot, jpeg, offset):
+    started = time.perf_counter()
+    state = _slots[slot]
+
+    # ---------- CHANGE DETECTOR ----------
+    thumb = jpeg_thumbnail(jpeg, offset)
+    if state.last_result is not None and not state.change.should_process(thumb):
+        state.change.mark_reused()
+        proctor_data = state.reuse_last()
+        proctor_data["timings"]["change_detect"] = time.perf_counter() - started
+        return os.getpid(), proctor_data, time.perf_counter() - started
+    change_done = time.perf_counter()
+
+    # Decoded here, not on the event loop; only the compressed bytes are
+    # shipped to the worker. One reduced-scale decode + one RGB conversion
+    # feeds every model. A bad JPEG comes back as a NO FRAME result.
+    frame = PreparedFrame.from_jpeg(jpeg, offset, INFER_SIZES)
+    decoded = time.perf_counter()
+    proctor_data = state.engine.process_frame(frame)
+
+    scoring = time.perf_counter()
+    try:
+        confused_flag, raw_confusion_score = get_confusion_state(
+            proctor_data["landmarks"],
+            proctor_data["happy_prob"]
+        )
+    except Exception as e:
+        log.warning("Confusion scoring error: %s", e)
+        confused_flag = False
+        raw_confusion_score = 0.0
+
+    # Landmarks stay in the worker; only scores go back to the server,
+    # plus a float16 copy when sessions are archived (landmark_archive.py)
+    landmarks = proctor_data.pop("landmarks", None)
+    emotion_probs = proctor_data.pop("emotion_probs", {})
+    if ARCHIVE_DIR:
+        proctor_data["archive"] = compact_frame(landmarks, emotion_probs)
+    # Per-stage timings go back with the result and are recorded by the server (metrics.py)
+    proctor_data["timings"].update(
+        change_detect=change_done - started,
+        jpeg_decode=decoded - change_done,
+        confusion=time.perf_counter() - scoring,
+    )
+    proctor_data["confused"] = confused_flag
+    proctor_data["confusion_score"] = raw_confusion_score
+    proctor_data["reused"] = False
+
+    if frame is not None:
+        state.change.mark_processed(thumb)
+        state.last_result = proctor_data
+
+    return os.getpid(), proctor_data, time.perf_counter() - started
+
+
+# --- Server process side ---
+class InferenceWorker:
+    """One single-process executor, its engine slots and utilization counters."""
+
+    def __init__(self, index: int, mp_context, slots: int):
+        self.index = index
+        self.mp_context = mp_context
+        self.slots = slots
+        self.free_slots = list(range(slots))
+        self.pid = None
+        self.in_flight = 0
+        self.jobs = 0
+        self.reused = 0
+        self.stage_runs = {stage: 0 for stage in STAGES}
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self.executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self.slots,)
+        )
+
+    def restart(self):
+        # Engines are rebuilt by the new process; leases keep their slot numbers
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._new_executor()
+        self.pid = None
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        except BrokenProcessPool:
+            self.errors += 1
+            print(f"⚠️ Inference worker {self.index} died, restarting")
+            self.restart()
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stats(self):
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "worker": self.index,
+            "pid": self.pid,
+            "leased": self.slots - len(self.free_slots),
+            "capacity": self.slots,
+            "in_flight": self.in_flight,
+            "jobs": self.jobs,
+            "reused": self.reused,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "utilization": round(min(self.busy_seconds / uptime, 1.0), 3),
+            "avg_ms": round(self.busy_seconds / self.jobs * 1000, 1) if self.jobs else 0.0,
+            # Fraction of frames on which each model actually ran
+            "stage_rates": {
+                stage: round(runs / self.jobs, 3) if self.jobs else 0.0
+                for stage, runs in self.stage_runs.items()
+            },
+        }
+
+
+class EngineLease:
+    """
+    A student's own ProctorEngine, pinned to one worker process so its
+    face track and gaze timer survive from frame to frame.
+    """
+
+    def __init__(self, pool: "InferencePool", worker: InferenceWorker, slot: int):
+        self.pool = pool
+        self.worker = worker
+        self.slot = slot
+        self.released = False
+
+    async def process(self, jpeg: bytes, offset: int = 0) -> dict:
+        """Analyse the JPEG that starts at `offset` inside `jpeg`."""
+        pid, proctor_data, elapsed = await self.worker.run(_run_inference, self.slot, jpeg, offset)
+        self.worker.pid = pid
+        self.worker.jobs += 1
+        self.worker.busy_seconds += elapsed
+        if proctor_data.get("reused"):
+            self.worker.reused += 1
+        for stage in proctor_data.pop("stages", []):
+            self.worker.stage_runs[stage] += 1
+        return proctor_data
+
+    async def release(self):
+        if self.released:
+            return
+        self.released = True
+        try:
+            await self.worker.run(_release_engine, self.slot)
+        except Exception as e:
+            print("⚠️ Failed to reset engine:", e)
+        await self.pool._return(self)
+
+
+class InferencePool:
+    """
+    Runs ProctorEngine inference in worker processes so the event loop
+    never blocks on MediaPipe / FER. Each connected student leases one
+    engine; new leases go to the worker with the most free engines.
+    """
+
+    def __init__(self, workers: int = INFERENCE_WORKERS, engines_per_worker: int = ENGINES_PER_WORKER):
+        # spawn: forking a process that already runs an event loop and
+        # MediaPipe threads is not safe
+        self.mp_context = multiprocessing.get_context("spawn")
+        self.size = max(1, workers)
+        self.engines_per_worker = max(1, engines_per_worker)
+        self.workers: List[InferenceWorker] = []
+        self._start_lock = None
+        self._slot_freed = None
+
+    async def start(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+            self._slot_freed = asyncio.Condition()
+        async with self._start_lock:
+            if not self.workers:
+                await self._spawn_workers()
+
+    async def _spawn_workers(self):
+        self.workers = [
+            InferenceWorker(i, self.mp_context, self.engines_per_worker)
+            for i in range(self.size)
+        ]
+        # Force every worker to spawn and pre-load its models now,
+        # not on the first student frame
+        pids = await asyncio.gather(*(w.run(_warmup) for w in self.workers))
+        for w, pid in zip(self.workers, pids):
+            w.pid = pid
+            w.started_at = time.monotonic()
+        print(f"✅ Inference pool ready: {self.size} worker(s) x {self.engines_per_worker} engines.")
+
+    def shutdown(self):
+        for w in self.workers:
+            w.executor.shutdown(wait=False, cancel_futures=True)
+        self.workers = []
+
+    def _has_free_slot(self):
+        return any(w.free_slots for w in self.workers)
+
+    async def lease(self, timeout: float = LEASE_TIMEOUT) -> EngineLease:
+        """Wait for a free engine. Raises asyncio.TimeoutError if the pool stays full."""
+        await self.start()
+        async with self._slot_freed:
+            await asyncio.wait_for(self._slot_freed.wait_for(self._has_free_slot), timeout)
+            worker = max(self.workers, key=lambda w: len(w.free_slots))
+            return EngineLease(self, worker, worker.free_slots.pop())
+
+    async def _return(self, lease: EngineLease):
+        async with self._slot_freed:
+            if lease.worker in self.workers:
+                lease.worker.free_slots.append(lease.slot)
+            self._slot_freed.notify()
+
+    def stats(self):
+        return {
+            "workers": [w.stats() for w in self.workers],
+            "size": self.size,
+            "leased": sum(w.slots - len(w.free_slots) for w in self.workers),
+            "capacity": self.size * self.engines_per_worker,
+            "in_flight": sum(w.in_flight for w in self.workers),
+        }
+
+
+inference_pool = InferencePool()
@@ -0,0 +1,66 @@
+# ingest.py
+import asyncio
+import time
+
+import metrics
+
+
+class LatestFrameSlot:
+    """
+    Depth-1 "latest frame wins" mailbox between a student's receiver task
+    and processor task. put() never blocks: a frame that arrives while the
+    previous one is still waiting replaces it and counts as dropped, so the
+    processor always works on the newest frame.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._put_at = 0.0
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.last_queue_age_ms = 0.0
+        self.max_queue_age_ms = 0.0
+
+    def put(self, item):
+        if self._item is not None:
+            self.dropped += 1
+            metrics.FRAMES_DROPPED.inc()
+        self._item = item
+        self._put_at = time.monotonic()
+        self.received += 1
+        metrics.FRAMES_RECEIVED.inc()
+        self._ready.set()
+
+    async def get(self):
+        """Wait for the next frame. Returns None once the slot is closed."""
+        while self._item is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        item, self._item = self._item, None
+        age_ms = (time.monotonic() - self._put_at) * 1000
+        metrics.observe("queue_wait", age_ms / 1000)
+        self.last_queue_age_ms = age_ms
+        self.max_queue_age_ms = max(self.max_queue_age_ms, age_ms)
+        self.processed += 1
+        return item
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "pending": self._item is not None,
+            "last_queue_age_ms": round(self.last_queue_age_ms, 1),
+            "max_queue_age_ms": round(self.max_queue_age_ms, 1),
+        }
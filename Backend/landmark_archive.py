@@ -0,0 +1,284 @@
+# landmark_archive.py
+"""
+Optional per-session archive of what the confusion score is computed from:
+each frame's face-mesh landmarks (float16) and FER emotion probabilities,
+so sessions can be re-scored offline with new weights (rescore.py) without
+running the models again.
+
+One append-only file per student connection and class session:
+
+    LANDMARK_ARCHIVE_DIR/<session>/<student_id>-<connected at, ms>.lmk
+
+A HEADER followed by fixed-size RECORDs, one per telemetry row. Sockets
+only queue records; archive_writer writes them out in a worker thread.
+Readers memory-map the records (open_archive), so re-scoring a long
+session never loads it into memory at once.
+"""
+import asyncio
+import glob
+import logging
+import os
+import re
+import time
+from collections import deque
+
+import numpy as np
+
+from ml.confusion import MIN_LANDMARKS
+from ml.landmarks import NUM_LANDMARKS
+
+# Unset = no archive
+ARCHIVE_DIR = os.getenv("LANDMARK_ARCHIVE_DIR", "")
+
+log = logging.getLogger("smartsession")
+
+# Bytes buffered per open archive before they're written out (~90 frames)
+WRITE_BUFFER_BYTES = 256 * 1024
+# Queued records are written out once this many are waiting ...
+FLUSH_RECORDS = 256
+# ... or at least this often
+FLUSH_INTERVAL_MS = 1000
+# Cap on queued records (~3 KB each); newer ones are dropped while the disk lags
+MAX_PENDING_RECORDS = 20000
+
+MAGIC = b"SSLMK\x00\x00\x00"
+FORMAT_VERSION = 1
+
+# FER's emotion labels, in the order they're stored
+EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+# Record flags
+HAS_LANDMARKS = 1
+REUSED = 2  # near-duplicate frame, result carried over from the previous one
+
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("landmarks", "<u2"),
+    ("emotions", "<u2"),
+    ("record_size", "<u2"),
+    ("student_id", "<i8"),
+    ("created_ms", "<i8"),
+    ("session", "S64"),
+])
+
+RECORD = np.dtype([
+    ("timestamp_ms", "<i8"),       # = the telemetry row's timestamp
+    ("seq", "<i8"),                # client frame sequence number, -1 if none
+    ("flags", "u1"),
+    ("face_count", "u1"),
+    ("reserved", "V2"),
+    ("confusion_score", "<f4"),    # as scored live
+    ("happy_prob", "<f4"),
+    ("emotions", "<f4", (len(EMOTIONS),)),
+    ("landmarks", "<f2", (NUM_LANDMARKS, 3)),
+])
+
+
+def compact_frame(landmarks, emotion_probs):
+    """
+    Worker side: what the archive keeps of one analysed frame, small enough
+    to ship back to the server with the result.
+    """
+    if landmarks is not None and len(landmarks) >= MIN_LANDMARKS:
+        landmarks = np.asarray(landmarks[:NUM_LANDMARKS], dtype=np.float16)
+    else:
+        landmarks = None
+    emotions = np.array([emotion_probs.get(name, 0.0) for name in EMOTIONS], dtype=np.float32)
+    return landmarks, emotions
+
+
+def pack_record(timestamp_ms, seq, proctor_data):
+    """One RECORD as bytes, from a telemetry row's timestamp and its proctor result."""
+    landmarks, emotions = proctor_data.get("archive") or (None, None)
+    r = np.zeros(1, RECORD)
+    r["timestamp_ms"] = timestamp_ms
+    r["seq"] = -1 if seq is None else seq
+    r["flags"] = (HAS_LANDMARKS if landmarks is not None else 0) | (REUSED if proctor_data["reused"] else 0)
+    r["face_count"] = min(proctor_data["face_count"], 255)
+    r["confusion_score"] = proctor_data["confusion_score"]
+    r["happy_prob"] = proctor_data["happy_prob"]
+    if emotions is not None:
+        r["emotions"] = emotions
+    if landmarks is not None:
+        r["landmarks"] = landmarks
+    return r.tobytes()
+
+
+def _safe_name(session):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", session)[:64] or "_"
+
+
+class LandmarkArchive:
+    """Append-only writer for one student's archive file."""
+
+    def __init__(self, path, student_id, session):
+        self.path = path
+        self.session = session
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "ab", buffering=WRITE_BUFFER_BYTES)
+        if self.file.tell() == 0:
+            header = np.zeros(1, HEADER)
+            header[0] = (
+                MAGIC, FORMAT_VERSION, NUM_LANDMARKS, len(EMOTIONS), RECORD.itemsize,
+                student_id, int(time.time() * 1000), session.encode()[:64],
+            )
+            self.file.write(header.tobytes())
+        self.frames = 0
+
+    @classmethod
+    def create(cls, student_id, session, root=None):
+        root = root or ARCHIVE_DIR
+        name = f"{student_id}-{int(time.time() * 1000)}.lmk"
+        return cls(os.path.join(root, _safe_name(session), name), student_id, session)
+
+    def write(self, record):
+        """Append one pack_record() result."""
+        self.file.write(record)
+        self.frames += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class ArchiveWriter:
+    """
+    Write-behind for the archives, like telemetry_writer. Student sockets
+    call append() and close(), which only queue; a background task opens,
+    writes and closes the files in a worker thread, so the event loop never
+    waits on the disk. Each connection (any hashable key, e.g. its
+    WebSocket) gets its own file, reopened when its session changes.
+    """
+
+    def __init__(self, root=None, flush_records=FLUSH_RECORDS, flush_interval_ms=FLUSH_INTERVAL_MS,
+                 max_pending=MAX_PENDING_RECORDS):
+        self.root = root
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        # (connection, student_id, session, record); a record of None closes the file
+        self.pending = deque()
+        self.queued = 0
+        # connection -> LandmarkArchive, only touched by the writer thread
+        self.files = {}
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed_writes = 0
+
+    def append(self, connection, student_id, session, timestamp_ms, seq, proctor_data):
+        if self.queued >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append((connection, student_id, session, pack_record(timestamp_ms, seq, proctor_data)))
+        self.queued += 1
+        if self.queued >= self.flush_records and self._wakeup is not None:
+            self._wakeup.set()
+
+    def close(self, connection):
+        """Close this connection's archive once the records queued before are written."""
+        self.pending.append((connection, None, None, None))
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task, write out everything queued and close every archive."""
+        if self._task is not None:
+            # Not cancelled, so a write in progress finishes
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self._close_all)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        ops = list(self.pending)
+        self.pending.clear()
+        self.queued = 0
+        await asyncio.to_thread(self._write, ops)
+
+    def _write(self, ops):
+        """Writer thread: apply queued appends and closes in order."""
+        failed, error = 0, None
+        for connection, student_id, session, record in ops:
+            archive = self.files.get(connection)
+            try:
+                if record is None:
+                    if archive is not None:
+                        del self.files[connection]
+                        archive.close()
+                    continue
+                if archive is None or archive.session != session:
+                    if archive is not None:
+                        del self.files[connection]
+                        archive.close()
+                    archive = self.files[connection] = LandmarkArchive.create(student_id, session, self.root)
+                archive.write(record)
+                self.written += 1
+            except OSError as e:
+                failed, error = failed + 1, e
+        if failed:
+            self.failed_writes += failed
+            log.warning("Landmark archive: %d of %d writes failed: %s", failed, len(ops), error)
+
+    def _close_all(self):
+        for archive in self.files.values():
+            archive.close()
+        self.files.clear()
+
+    def stats(self):
+        return {
+            "open_files": len(self.files),
+            "queue_depth": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_writes": self.failed_writes,
+        }
+
+
+archive_writer = ArchiveWriter()
+
+
+def open_archive(path):
+    """
+    (header, records): the header as a numpy record and the records
+    memory-mapped read-only. A partly written last record is ignored.
+    """
+    header = np.fromfile(path, HEADER, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC.rstrip(b"\x00"):
+        raise ValueError(f"{path}: not a landmark archive")
+    header = header[0]
+    if (header["version"], header["record_size"]) != (FORMAT_VERSION, RECORD.itemsize):
+        raise ValueError(f"{path}: unsupported archive format {header['version']}")
+
+    count = (os.path.getsize(path) - HEADER.itemsize) // RECORD.itemsize
+    if count == 0:
+        return header, np.zeros(0, RECORD)
+    return header, np.memmap(path, RECORD, mode="r", offset=HEADER.itemsize, shape=(count,))
+
+
+def find_archives(root=None, session=None, student_id=None):
+    """Archive files under `root`, optionally for one session and/or student."""
+    session_dir = _safe_name(session) if session else "*"
+    student = str(student_id) if student_id is not None else "*"
+    return sorted(glob.glob(os.path.join(root or ARCHIVE_DIR, session_dir, f"{student}-*.lmk")))
@@ -0,0 +1,62 @@
+# metrics.py
+"""
+Prometheus metrics, served by GET /metrics.
+
+Model stages run in the inference worker processes; the worker times them
+and sends the timings back with each result, so everything is recorded
+here, in the server process. With several server processes (see
+backplane.py) each one exposes its own numbers.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# 0.5 ms .. 2.5 s
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Per-frame stages, in pipeline order. header_parse is the frame header (or
+# the legacy JSON message) once it has arrived. change_detect, jpeg_decode,
+# detection, mesh, fer and confusion are measured in the worker; inference
+# is the whole round trip to it as seen from the socket.
+STAGES = (
+    "header_parse", "base64_decode", "queue_wait", "inference",
+    "change_detect", "jpeg_decode", "detection", "mesh", "fer", "confusion",
+    "features", "broadcast", "teacher_send", "db_write",
+)
+
+STAGE_SECONDS = Histogram(
+    "smartsession_stage_seconds", "Time spent in each pipeline stage", ["stage"], buckets=STAGE_BUCKETS
+)
+_stage = {stage: STAGE_SECONDS.labels(stage) for stage in STAGES}
+
+FRAMES = Counter("smartsession_frames_total", "Student frames by outcome", ["outcome"])
+FRAMES_RECEIVED = FRAMES.labels("received")
+FRAMES_DROPPED = FRAMES.labels("dropped")      # replaced in the latest-frame slot before processing
+FRAMES_UNREADABLE = FRAMES.labels("unreadable")
+FRAMES_ANALYSED = FRAMES.labels("analysed")
+FRAMES_REUSED = FRAMES.labels("reused")        # change detector kept the previous result
+FRAMES_FAILED = FRAMES.labels("failed")
+
+TELEMETRY_ROWS_WRITTEN = Counter("smartsession_telemetry_rows_written_total", "Telemetry rows inserted")
+TELEMETRY_ROWS_DROPPED = Counter("smartsession_telemetry_rows_dropped_total", "Telemetry rows dropped by the write buffer")
+TEACHER_MESSAGES_DROPPED = Counter(
+    "smartsession_teacher_messages_dropped_total", "Messages dropped from slow teachers' queues"
+)
+
+STUDENTS_CONNECTED = Gauge("smartsession_students_connected", "Student sockets on this process")
+TEACHERS_CONNECTED = Gauge("smartsession_teachers_connected", "Teacher sockets on this process")
+ENGINES_LEASED = Gauge("smartsession_engines_leased", "Inference engines leased to students")
+TELEMETRY_QUEUE_DEPTH = Gauge("smartsession_telemetry_queue_depth", "Telemetry rows waiting to be written")
+
+
+def observe(stage, seconds):
+    _stage[stage].observe(seconds)
+
+
+def observe_all(timings):
+    """Record a {stage: seconds} dict, e.g. the timings a worker sent back."""
+    for stage, seconds in timings.items():
+        _stage[stage].observe(seconds)
+
+
+def render():
+    """(body, content type) for the /metrics response."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,114 @@
+# migrations.py
+from datetime import timezone
+
+from sqlalchemy import bindparam, inspect, select, text, update
+
+from database import Base, schema_lock
+from models import Telemetry
+from rollups import backfill  # imports models, so Base knows every table
+
+LOCALTIME_BATCH = 10000
+
+# create_all() only creates missing tables, it never alters existing ones.
+# Columns added after the first release are listed here and added in place.
+# (table, column, SQL type + default)
+ADDED_COLUMNS = [
+    ("telemetry", "reused", "BOOLEAN DEFAULT FALSE"),
+    ("telemetry", "smoothed_confusion", "FLOAT"),
+    ("telemetry", "gaze_away_seconds", "FLOAT"),
+    ("telemetry", "face_absent_seconds", "FLOAT"),
+    ("telemetry_minute", "smoothed_sum", "FLOAT DEFAULT 0"),
+    ("telemetry_minute", "happy_n", "INTEGER DEFAULT 0"),
+    ("telemetry_minute", "gaze_down", "INTEGER DEFAULT 0"),
+    ("telemetry_minute", "gaze_left", "INTEGER DEFAULT 0"),
+    ("telemetry_minute", "gaze_right", "INTEGER DEFAULT 0"),
+    ("telemetry_minute", "gaze_up", "INTEGER DEFAULT 0"),
+]
+
+# Indexes added after the first release: (name, table, columns)
+ADDED_INDEXES = [
+    ("ix_telemetry_student_time", "telemetry", ["student_id", "timestamp"]),
+]
+
+
+def run_migrations(engine):
+    """
+    Create missing tables and apply the changes above. Every server process
+    runs this at import, so it all happens under schema_lock(): the first
+    process migrates, the others wait and then find nothing left to do.
+    """
+    with schema_lock(engine) as conn:
+        inspector = inspect(conn)
+        had_telemetry = inspector.has_table("telemetry")
+        had_rollups = inspector.has_table("telemetry_minute")
+        Base.metadata.create_all(bind=conn)
+
+        inspector = inspect(conn)
+        rebuild_rollups = had_telemetry and not had_rollups
+        # The first release stamped live rows with server local time (its
+        # column default, datetime.utcnow, never applied: the socket always
+        # passed a timestamp). It predates the `reused` column, so a
+        # telemetry table without it holds local times; everything written
+        # since is naive UTC, which the rollups and from/to filters assume.
+        local_timestamps = had_telemetry and "reused" not in {
+            c["name"] for c in inspector.get_columns("telemetry")
+        }
+        for table, column, ddl in ADDED_COLUMNS:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                print(f"🛠 Adding column {table}.{column}")
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                # Existing rollup rows have nothing in a new rollup column yet
+                rebuild_rollups = rebuild_rollups or table == "telemetry_minute"
+
+        for name, table, columns in ADDED_INDEXES:
+            existing = {i["name"] for i in inspector.get_indexes(table)}
+            if name not in existing:
+                print(f"🛠 Creating index {name} on {table}({', '.join(columns)})")
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+        if local_timestamps:
+            print(f"🛠 Converted {localtime_to_utc(conn)} telemetry timestamps from local time to UTC")
+            rebuild_rollups = True  # any rollups were bucketed by the old times
+
+        # Only when this upgrade created the rollup table or changed it; any
+        # other rebuild is an explicit `python rollups.py`
+        if rebuild_rollups:
+            print("🛠 Rebuilding telemetry_minute rollups from raw telemetry")
+            print(f"🛠 Rolled up {backfill(conn)} telemetry rows")
+
+
+def localtime_to_utc(conn):
+    """
+    Re-stamp telemetry written as naive server local time as naive UTC, in
+    id order and in batches. Assumes the migrating process runs in the time
+    zone of the server that wrote the rows; on a UTC host nothing changes.
+    """
+    telemetry = Telemetry.__table__
+    restamp = (
+        update(telemetry)
+        .where(telemetry.c.id == bindparam("row_id"))
+        .values(timestamp=bindparam("utc"))
+    )
+    converted = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(telemetry.c.id, telemetry.c.timestamp)
+            .where(telemetry.c.id > last_id)
+            .order_by(telemetry.c.id)
+            .limit(LOCALTIME_BATCH)
+        ).all()
+        if not rows:
+            return converted
+        last_id = rows[-1][0]
+        changed = []
+        for row_id, ts in rows:
+            if ts is None:
+                continue
+            utc = ts.astimezone(timezone.utc).replace(tzinfo=None)  # naive -> read as local time
+            if utc != ts:
+                changed.append({"row_id": row_id, "utc": utc})
+        if changed:
+            conn.execute(restamp, changed)
+            converted += len(changed)
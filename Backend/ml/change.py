@@ -0,0 +1,55 @@
+# ml/change.py
+import cv2
+import numpy as np
+
+THUMB_SIZE = (32, 24)  # (w, h) of the grayscale thumbnail that gets compared
+
+
+def jpeg_thumbnail(buf, offset=0):
+    """
+    Tiny grayscale thumbnail straight from JPEG bytes. IMREAD_REDUCED_GRAYSCALE_8
+    lets libjpeg skip most of the IDCT work, so this is far cheaper than a full
+    decode and lets near-duplicate frames skip decoding altogether.
+    """
+    # Header-only message: cv2.imdecode raises on an empty buffer
+    if len(buf) <= offset:
+        return None
+    np_arr = np.frombuffer(buf, np.uint8, offset=offset)
+    small = cv2.imdecode(np_arr, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if small is None:
+        return None
+    return cv2.resize(small, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+class ChangeDetector:
+    """
+    Decides whether a frame differs enough from the last analysed one to be
+    worth running the models on. Change is the mean absolute difference of
+    the thumbnails, scaled to 0..1. Every `refresh_every` frames a full run
+    is forced regardless, so slow drifts and timers never go stale.
+    """
+
+    def __init__(self, threshold, refresh_every):
+        self.threshold = threshold
+        self.refresh_every = max(1, refresh_every)
+        self.reset()
+
+    def reset(self):
+        self.reference = None
+        self.since_refresh = 0
+        self.last_change = 1.0
+
+    def should_process(self, thumb):
+        if thumb is None or self.reference is None or self.threshold <= 0:
+            return True
+        self.last_change = float(cv2.absdiff(thumb, self.reference).mean()) / 255.0
+        if self.since_refresh + 1 >= self.refresh_every:
+            return True
+        return self.last_change >= self.threshold
+
+    def mark_processed(self, thumb):
+        self.reference = thumb
+        self.since_refresh = 0
+
+    def mark_reused(self):
+        self.since_refresh += 1
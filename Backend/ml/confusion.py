@@ -1,57 +1,135 @@
-# ml/confusion.py
-import numpy as np
-
-def dist(a, b):
-    return np.linalg.norm(np.array(a) - np.array(b))
-
-
-def get_confusion_state(landmarks, happy_prob):
-    try:
-        if not landmarks or len(landmarks) < 455:
-            return False, 0.0
-
-        # Eyes for scale
-        L_eye = landmarks[133]
-        R_eye = landmarks[362]
-        face_scale = dist((L_eye.x, L_eye.y), (R_eye.x, R_eye.y))
-        if face_scale == 0:
-            return False, 0.0
-
-        # Brows
-        L_brow = landmarks[70]
-        R_brow = landmarks[300]
-        brow_dist = dist((L_brow.x, L_brow.y), (R_brow.x, R_brow.y)) / face_scale
-
-        # Head tilt
-        L_ear = landmarks[234]
-        R_ear = landmarks[454]
-        tilt = abs(L_ear.y - R_ear.y) / face_scale
-
-        # ---- Normalization tuned for MediaPipe ----
-        # Example: if raw brow_dist ~ 3 normally
-        brow_norm = min(brow_dist / 3.5, 1.0)
-        tilt_norm = min(tilt / 0.12, 1.0)  # maybe tune later too
-
-        happy_norm = max(0.0, min(happy_prob, 1.0))
-
-        # ---- Confusion score ----
-        confusion_score = (
-            0.45 * (1 - brow_norm) +
-            0.35 * (1 - happy_norm) +
-            0.20 * tilt_norm
-        )
-
-        confusion_score = max(0.0, min(confusion_score, 1.0))
-        confusion_score = float(confusion_score)  # ensure type
-        
-        confused = confusion_score >= 0.58
-
-        print("DEBUG →", confusion_score, confused, type(confusion_score))
-        # print(f"raw brow={brow_dist:.3f} tilt={tilt:.3f} happy={happy_prob:.2f} "f"→ norm brow={brow_norm:.3f} tilt={tilt_norm:.3f} happy={happy_norm:.2f} ""→ confusion={confusion_score:.2f}")
-
-
-        return confused, confusion_score
-
-    except Exception as e:
-        print("⚠️ get_confusion_state error:", e)
-        return False, 0.0
+# ml/confusion.py
+import logging
+import math
+
+import numpy as np
+
+from ml.landmarks import landmark_array
+
+log = logging.getLogger("smartsession")
+
+# Normalization and weights of the confusion score. rescore.py re-scores
+# archived sessions with a modified copy.
+DEFAULT_SCORING = {
+    "brow_scale": 3.5,     # brow distance (in eye distances) counted as fully relaxed
+    "tilt_scale": 0.12,    # head tilt (in eye distances) counted as fully tilted
+    "brow_weight": 0.45,
+    "happy_weight": 0.35,
+    "tilt_weight": 0.20,
+    "threshold": 0.58,
+}
+
+CONFUSION_THRESHOLD = DEFAULT_SCORING["threshold"]
+
+# Landmark pairs measured per face, as (left, right) mesh indices
+EYES = (133, 362)    # inner eye corners, for scale
+BROWS = (70, 300)
+EARS = (234, 454)    # face edge at ear height, for head tilt
+MIN_LANDMARKS = 455  # highest index used + 1
+
+LEFT = [EYES[0], BROWS[0], EARS[0]]
+RIGHT = [EYES[1], BROWS[1], EARS[1]]
+PAIRS = LEFT + RIGHT
+
+
+def confusion_scores(points, happy_probs, scoring=DEFAULT_SCORING):
+    """
+    Vectorized scoring. `points` is (B, N, 2+) landmark arrays stacked for B
+    faces, `happy_probs` is (B,). Returns (confused, scores) arrays of shape (B,).
+    """
+    return _score_pairs(np.asarray(points)[:, PAIRS, :2], happy_probs, scoring)
+
+
+def _score_pairs(pairs, happy_probs, scoring=DEFAULT_SCORING):
+    """`pairs` is (B, 6, 2): left eye, brow, ear, then right eye, brow, ear."""
+    # float64 so scores match the original scalar formula
+    pairs = pairs.astype(np.float64)
+    diff = pairs[:, :3] - pairs[:, 3:]
+    dists = np.sqrt((diff * diff).sum(axis=2))  # (B, 3): eyes, brows, ears
+    face_scale = dists[:, 0]
+    valid = face_scale > 0
+    scale = np.where(valid, face_scale, 1.0)
+
+    brow_dist = dists[:, 1] / scale
+    tilt = np.abs(diff[:, 2, 1]) / scale
+
+    # ---- Normalization tuned for MediaPipe ----
+    # Example: if raw brow_dist ~ 3 normally
+    brow_norm = np.minimum(brow_dist / scoring["brow_scale"], 1.0)
+    tilt_norm = np.minimum(tilt / scoring["tilt_scale"], 1.0)  # maybe tune later too
+
+    happy_norm = np.minimum(np.maximum(np.asarray(happy_probs, dtype=np.float64), 0.0), 1.0)
+
+    # ---- Confusion score ----
+    scores = (
+        scoring["brow_weight"] * (1 - brow_norm) +
+        scoring["happy_weight"] * (1 - happy_norm) +
+        scoring["tilt_weight"] * tilt_norm
+    )
+    scores = np.where(valid, np.minimum(np.maximum(scores, 0.0), 1.0), 0.0)
+    return scores >= scoring["threshold"], scores
+
+
+def score_batch(landmarks_list, happy_probs):
+    """
+    Score many faces in one call, e.g. every student of a class or a stored
+    archive. Entries may be (N, 3) arrays, MediaPipe landmark lists or
+    empty/None (no face); returns a list of (confused, score) like
+    get_confusion_state.
+    """
+    results = [(False, 0.0)] * len(landmarks_list)
+    index, stacked, happy = [], [], []
+    for i, (landmarks, happy_prob) in enumerate(zip(landmarks_list, happy_probs)):
+        if landmarks is None or len(landmarks) < MIN_LANDMARKS:
+            continue
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = landmark_array(landmarks)
+        index.append(i)
+        stacked.append(landmarks[PAIRS, :2])
+        happy.append(happy_prob)
+
+    if index:
+        pairs = np.stack(stacked) if len(stacked) > 1 else stacked[0][np.newaxis]
+        confused, scores = _score_pairs(pairs, happy)
+        for i, flag, score in zip(index, confused.tolist(), scores.tolist()):
+            results[i] = (flag, score)
+    return results
+
+
+def _score_one(points, happy_prob, scoring=DEFAULT_SCORING):
+    """
+    _score_pairs for a single face in plain floats: the live path scores one
+    face per frame, where numpy's per-call overhead costs more than the maths.
+    Same operations in the same order, so the scores are identical.
+    """
+    (lex, ley), (lbx, lby), (lax, lay), (rex, rey), (rbx, rby), (rax, ray) = points[PAIRS, :2].tolist()
+    face_scale = math.sqrt((lex - rex) * (lex - rex) + (ley - rey) * (ley - rey))
+    if not face_scale > 0:
+        return False, 0.0
+    brow_dist = math.sqrt((lbx - rbx) * (lbx - rbx) + (lby - rby) * (lby - rby)) / face_scale
+    tilt = abs(lay - ray) / face_scale
+
+    brow_norm = min(brow_dist / scoring["brow_scale"], 1.0)
+    tilt_norm = min(tilt / scoring["tilt_scale"], 1.0)
+    happy_norm = min(max(float(happy_prob), 0.0), 1.0)
+
+    score = (
+        scoring["brow_weight"] * (1 - brow_norm) +
+        scoring["happy_weight"] * (1 - happy_norm) +
+        scoring["tilt_weight"] * tilt_norm
+    )
+    score = min(max(score, 0.0), 1.0)
+    return score >= scoring["threshold"], score
+
+
+def get_confusion_state(landmarks, happy_prob):
+    """One face: (confused, score). `landmarks` as accepted by score_batch."""
+    try:
+        if landmarks is None or len(landmarks) < MIN_LANDMARKS:
+            return False, 0.0
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = landmark_array(landmarks)
+        return _score_one(landmarks, happy_prob)
+    except Exception as e:
+        log.warning("get_confusion_state error: %s", e)
+        return False, 0.0
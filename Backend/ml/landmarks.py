@@ -0,0 +1,46 @@
+# ml/landmarks.py
+import numpy as np
+
+# FaceMesh with refine_landmarks=True: 468 face points + 10 iris points
+NUM_LANDMARKS = 478
+
+# A serialized NormalizedLandmarkList whose landmarks only carry x, y, z is
+# a run of 17-byte records: field 1 (a landmark, 15 bytes long) holding the
+# little-endian fixed32 fields 1, 2 and 3
+_RECORD_SIZE = 17
+_TAG_BYTES = np.array([0, 1, 2, 7, 12])
+_TAGS = np.array([0x0A, 15, 0x0D, 0x15, 0x1D], dtype=np.uint8)
+_FLOAT_BYTES = np.array([3, 4, 5, 6, 8, 9, 10, 11, 13, 14, 15, 16])
+
+
+def landmark_array(landmarks):
+    """
+    MediaPipe landmarks -> (N, 3) float32 array of x, y, z. Done once per
+    mesh pass; everything downstream indexes the array instead of protobuf
+    objects, and the array (unlike the protobufs) can be pickled.
+
+    Pass the NormalizedLandmarkList itself (`multi_face_landmarks[0]`) to
+    decode its serialized bytes in one go; a plain sequence of landmarks is
+    read point by point. The bytes are only used when they are exactly one
+    x/y/z record per landmark, every tag and length where expected; any
+    other encoding (an omitted or extra field, a new MediaPipe version)
+    falls back to reading point by point.
+    """
+    if hasattr(landmarks, "SerializeToString"):
+        count = len(landmarks.landmark)
+        data = landmarks.SerializeToString()
+        if len(data) == count * _RECORD_SIZE:
+            records = np.frombuffer(data, dtype=np.uint8).reshape(count, _RECORD_SIZE)
+            if (records.take(_TAG_BYTES, axis=1) == _TAGS).all():
+                points = records.take(_FLOAT_BYTES, axis=1).view("<f4")
+                if points.shape == (count, 3):
+                    return points
+        landmarks = landmarks.landmark
+
+    count = len(landmarks)
+    flat = np.fromiter(
+        (v for p in landmarks for v in (p.x, p.y, p.z)),
+        dtype=np.float32,
+        count=count * 3,
+    )
+    return flat.reshape(count, 3)
@@ -0,0 +1,116 @@
+# ml/preprocess.py
+import logging
+
+import cv2
+import numpy as np
+
+log = logging.getLogger("smartsession")
+
+# JPEG start-of-frame markers (baseline, progressive, ...); C4/C8/CC are not SOFs
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# libjpeg can decode at 1/2, 1/4 and 1/8 scale for a fraction of the cost
+REDUCED_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+
+def jpeg_dimensions(buf, offset=0):
+    """(width, height) from the JPEG header without decoding, or None."""
+    n = len(buf)
+    if n < offset + 4 or buf[offset] != 0xFF or buf[offset + 1] != 0xD8:
+        return None
+    i = offset + 2
+    while i + 9 < n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # markers without a length
+            i += 2
+            continue
+        if marker in SOF_MARKERS:
+            height = (buf[i + 5] << 8) | buf[i + 6]
+            width = (buf[i + 7] << 8) | buf[i + 8]
+            return width, height
+        i += 2 + ((buf[i + 2] << 8) | buf[i + 3])
+    return None
+
+
+def decode_rgb(buf, offset=0, long_side=0):
+    """
+    Decode JPEG bytes to an RGB frame whose longer side is at most
+    `long_side` (0 = native size). Uses libjpeg's reduced-scale decode to
+    get close to the target, then one INTER_AREA resize and one colour
+    conversion on the already-small image.
+    """
+    if not buf or len(buf) <= offset:
+        return None
+
+    flag = cv2.IMREAD_COLOR
+    if long_side:
+        dims = jpeg_dimensions(buf, offset)
+        if dims:
+            scale = max(dims) / long_side
+            for factor, reduced_flag in REDUCED_FLAGS:
+                if scale >= factor:
+                    flag = reduced_flag
+                    break
+
+    try:
+        bgr = cv2.imdecode(np.frombuffer(buf, np.uint8, offset=offset), flag)
+    except Exception as e:
+        log.warning("Failed to decode frame: %s", e)
+        return None
+    if bgr is None:
+        return None
+
+    bgr = fit_long_side(bgr, long_side)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+
+def fit_long_side(image, long_side):
+    height, width = image.shape[:2]
+    if not long_side or max(height, width) <= long_side:
+        return image
+    scale = long_side / max(height, width)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class PreparedFrame:
+    """
+    One decoded RGB frame shared by every model. `for_model()` returns the
+    frame itself, or a smaller copy when that model's target size is lower.
+    Copies are made once per size and shared between models that want it.
+    """
+
+    def __init__(self, rgb, sizes=None):
+        self.rgb = rgb
+        self.sizes = sizes or {}
+        self._views = {}
+
+    @classmethod
+    def from_bgr(cls, bgr, sizes=None):
+        return cls(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), sizes)
+
+    @classmethod
+    def from_jpeg(cls, buf, offset=0, sizes=None):
+        sizes = sizes or {}
+        # Decode once, at the largest size any model asked for
+        targets = list(sizes.values())
+        long_side = 0 if not targets or 0 in targets else max(targets)
+        rgb = decode_rgb(buf, offset, long_side)
+        return None if rgb is None else cls(rgb, sizes)
+
+    def for_model(self, model):
+        size = self.sizes.get(model, 0)
+        if not size or max(self.rgb.shape[:2]) <= size:
+            return self.rgb
+        if size not in self._views:
+            self._views[size] = fit_long_side(self.rgb, size)
+        return self._views[size]
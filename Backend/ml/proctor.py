@@ -1,116 +1,253 @@
-
-# ml/proctor.py
-import cv2
-import mediapipe as mp
-import time
-from fer import FER
-
-# MediaPipe models
-mp_face = mp.solutions.face_detection
-mp_mesh = mp.solutions.face_mesh
-
-emotion_detector = FER(mtcnn=True)
-
-VIOLATION_TIME = 4  # seconds for looking away
-
-
-def classify_direction(nose, left_eye, right_eye):
-    yaw = nose[0] - ((left_eye[0] + right_eye[0]) / 2)
-    pitch = nose[1] - ((left_eye[1] + right_eye[1]) / 2)
-
-    if yaw > 0.05: return "RIGHT"
-    if yaw < -0.05: return "LEFT"
-    if pitch > 0.05: return "DOWN"
-    if pitch < -0.05: return "UP"
-    return "CENTER"
-
-
-class ProctorEngine:
-    def __init__(self):
-        self.yaw_state = None
-        self.yaw_start_time = None
-        self.face_detector = mp_face.FaceDetection(model_selection=1, min_detection_confidence=0.6)
-        self.mesh = mp_mesh.FaceMesh(refine_landmarks=True)
-
-    def process_frame(self, frame):
-        if frame is None:
-            return {
-                "face_count": 0,
-                "status": "NO FRAME",
-                "emotion": "Unknown",
-                "landmarks": [],
-                "happy_prob": 0.0,
-                "gaze": "CENTER"
-            }
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # ---------- FACE COUNT ----------
-        face_results = self.face_detector.process(rgb)
-        face_count = 0 if not face_results.detections else len(face_results.detections)
-
-        status = "OK"
-        if face_count == 0:
-            status = "NO PERSON"
-        elif face_count > 1:
-            status = "MULTIPLE PEOPLE"
-
-        # ---------- LANDMARKS & GAZE ----------
-        landmarks = []
-        gaze = "CENTER"
-
-        mesh_results = self.mesh.process(rgb)
-        if mesh_results.multi_face_landmarks:
-            lm = mesh_results.multi_face_landmarks[0].landmark
-            landmarks = lm
-
-            nose = (lm[1].x, lm[1].y)
-            left_eye = (lm[33].x, lm[33].y)
-            right_eye = (lm[263].x, lm[263].y)
-
-            gaze = classify_direction(nose, left_eye, right_eye)
-
-            # Gaze violation timer
-            if gaze != "CENTER":
-                if self.yaw_state != gaze:
-                    self.yaw_state = gaze
-                    self.yaw_start_time = time.time()
-                else:
-                    if time.time() - self.yaw_start_time > VIOLATION_TIME:
-                        status = f"LOOKING {gaze}"
-            else:
-                self.yaw_state = None
-                self.yaw_start_time = None
-
-        # ---------- EMOTION ----------
-        happy_prob = 0.0
-        emotion_label = "Unknown"
-
-        try:
-            emotions = emotion_detector.detect_emotions(frame)
-            if emotions:
-                emo = emotions[0]["emotions"]
-                happy_prob = float(emo.get("happy", 0.0))
-                neutral_prob = float(emo.get("neutral", 0.0))
-
-                # Normalize if FER returns 0-100
-                if happy_prob > 1: happy_prob /= 100.0
-                if neutral_prob > 1: neutral_prob /= 100.0
-
-                if happy_prob > 0.35:
-                    emotion_label = "Happy / Engaged"
-                elif neutral_prob > 0.45:
-                    emotion_label = "Focused / Neutral"
-                else:
-                    emotion_label = "Confused"
-        except Exception as e:
-            print("⚠️ FER error:", e)
-
-        return {
-            "face_count": face_count,
-            "status": status,
-            "emotion": emotion_label,
-            "landmarks": landmarks,
-            "happy_prob": happy_prob,
-            "gaze": gaze
-        }
+
+# ml/proctor.py
+import cv2
+import logging
+import math
+import mediapipe as mp
+import time
+from fer import FER
+from ml.landmarks import landmark_array
+from ml.preprocess import PreparedFrame
+from ml.schedule import STAGES, STAGE_FIELDS, StageScheduler, landmark_points, parse_schedule
+
+log = logging.getLogger("smartsession")
+
+# MediaPipe models
+mp_face = mp.solutions.face_detection
+mp_mesh = mp.solutions.face_mesh
+
+# Faces are located by MediaPipe and handed over as crops, so FER only runs
+# its classification network (no MTCNN / cascade pass over the whole frame)
+emotion_detector = FER(mtcnn=False)
+
+# Stage outputs before the first frame / after a reset
+EMPTY_STAGE_OUTPUT = {
+    "face_count": 0,
+    "landmarks": None,
+    "gaze": "CENTER",
+    "happy_prob": 0.0,
+    "emotion": "Unknown",
+    "emotion_probs": {},
+    "face_box": None,
+}
+
+FACE_MARGIN = 1.15  # crop side relative to the landmark extents
+
+
+def classify_direction(nose, left_eye, right_eye):
+    yaw = nose[0] - ((left_eye[0] + right_eye[0]) / 2)
+    pitch = nose[1] - ((left_eye[1] + right_eye[1]) / 2)
+
+    if yaw > 0.05: return "RIGHT"
+    if yaw < -0.05: return "LEFT"
+    if pitch > 0.05: return "DOWN"
+    if pitch < -0.05: return "UP"
+    return "CENTER"
+
+
+# Face boxes are (x, y, w, h) normalized to 0..1, like MediaPipe's own
+# coordinates, so they apply to whichever resolution a model was given
+def face_box_from_landmarks(landmarks):
+    x_min, y_min = landmarks[:, :2].min(axis=0).tolist()
+    x_max, y_max = landmarks[:, :2].max(axis=0).tolist()
+    return x_min, y_min, x_max - x_min, y_max - y_min
+
+
+def face_box_from_detection(detection):
+    box = detection.location_data.relative_bounding_box
+    return box.xmin, box.ymin, box.width, box.height
+
+
+def aligned_face_crop(frame, box, landmarks=None):
+    """
+    Square crop around the normalized `box`, rotated so the eyes are level
+    when landmarks are available. Crop, rotation and resampling happen in
+    one warpAffine that only computes the output pixels.
+    """
+    height, width = frame.shape[:2]
+    x, y, w, h = box[0] * width, box[1] * height, box[2] * width, box[3] * height
+    side = int(max(w, h) * FACE_MARGIN)
+    if side < 8:
+        return None
+    cx, cy = x + w / 2, y + h / 2
+
+    angle = 0.0
+    if landmarks is not None:
+        lx, ly = landmarks[33, 0] * width, landmarks[33, 1] * height
+        rx, ry = landmarks[263, 0] * width, landmarks[263, 1] * height
+        angle = math.degrees(math.atan2(ry - ly, rx - lx))
+
+    M = cv2.getRotationMatrix2D((cx, cy), angle, 1.0)
+    M[0, 2] += side / 2 - cx
+    M[1, 2] += side / 2 - cy
+    return cv2.warpAffine(frame, M, (side, side), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def face_status(face_count):
+    if face_count == 0:
+        return "NO PERSON"
+    if face_count > 1:
+        return "MULTIPLE PEOPLE"
+    return "OK"
+
+
+class ProctorEngine:
+    """
+    Model state for ONE student: a video-mode FaceMesh that keeps its face
+    track between frames, and the stage scheduler with the last output of
+    every stage. Never share an engine between students; lease one per
+    connection and reset() it on return. Timers over several frames (gaze
+    violations, absence) live in the server's StudentFeatures.
+    """
+
+    def __init__(self, schedule=None, fer_motion=0.0):
+        self.face_detector = mp_face.FaceDetection(model_selection=1, min_detection_confidence=0.6)
+        # static_image_mode=False: detect once, then track landmarks frame to frame
+        self.mesh = mp_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=1,
+            refine_landmarks=True
+        )
+        # Default: every stage on every frame
+        self.scheduler = StageScheduler(schedule or parse_schedule(""), fer_motion)
+        self.last = dict(EMPTY_STAGE_OUTPUT)
+
+    def reset(self):
+        """Forget the previous student's face track and stage outputs."""
+        self.mesh.reset()
+        self.scheduler.reset()
+        self.last = dict(EMPTY_STAGE_OUTPUT)
+
+    def classify_emotion(self, rgb, box, landmarks=None):
+        """(happy_prob, label, every FER probability by name)"""
+        happy_prob = 0.0
+        emotion_label = "Unknown"
+        probs = {}
+        if box is None:
+            return happy_prob, emotion_label, probs
+
+        try:
+            crop = aligned_face_crop(rgb, box, landmarks)
+            if crop is None:
+                return happy_prob, emotion_label, probs
+            # FER expects BGR; only the small crop is converted back
+            crop = cv2.cvtColor(crop, cv2.COLOR_RGB2BGR)
+            side = crop.shape[0]
+            emotions = emotion_detector.detect_emotions(crop, face_rectangles=[(0, 0, side, side)])
+            if emotions:
+                emo = emotions[0]["emotions"]
+                # Normalize if FER returns 0-100
+                probs = {name: float(p) / 100.0 if p > 1 else float(p) for name, p in emo.items()}
+                happy_prob = probs.get("happy", 0.0)
+                neutral_prob = probs.get("neutral", 0.0)
+
+                if happy_prob > 0.35:
+                    emotion_label = "Happy / Engaged"
+                elif neutral_prob > 0.45:
+                    emotion_label = "Focused / Neutral"
+                else:
+                    emotion_label = "Confused"
+        except Exception as e:
+            log.warning("FER error: %s", e)
+
+        return happy_prob, emotion_label, probs
+
+    def process_frame(self, frame):
+        """`frame` is a PreparedFrame, or a BGR image for one-off calls."""
+        if frame is None:
+            return {
+                "face_count": 0,
+                "status": "NO FRAME",
+                "emotion": "Unknown",
+                "landmarks": None,
+                "tracked": False,
+                "happy_prob": 0.0,
+                "emotion_probs": {},
+                "gaze": "CENTER",
+                "stages": [],
+                "timings": {},
+                "carried_forward": []
+            }
+
+        if not isinstance(frame, PreparedFrame):
+            frame = PreparedFrame.from_bgr(frame)
+        last = self.last
+        ran = {}  # stage -> seconds it took on this frame
+
+        # ---------- FACE COUNT ----------
+        if self.scheduler.due("detection"):
+            started = time.perf_counter()
+            face_results = self.face_detector.process(frame.for_model("detection"))
+            face_count = 0 if not face_results.detections else len(face_results.detections)
+            detection_box = None
+            if face_results.detections:
+                detection_box = face_box_from_detection(face_results.detections[0])
+            ran["detection"] = time.perf_counter() - started
+        else:
+            face_count = last["face_count"]
+            detection_box = last["face_box"]
+
+        status = face_status(face_count)
+
+        # ---------- LANDMARKS & GAZE ----------
+        if self.scheduler.due("mesh"):
+            started = time.perf_counter()
+            landmarks = None
+            gaze = "CENTER"
+
+            mesh_results = self.mesh.process(frame.for_model("mesh"))
+            if mesh_results.multi_face_landmarks:
+                # (478, 3) float32, converted once from the protobuf list
+                landmarks = landmark_array(mesh_results.multi_face_landmarks[0])
+                nose, left_eye, right_eye = landmarks[[1, 33, 263], :2].tolist()
+
+                gaze = classify_direction(nose, left_eye, right_eye)
+            ran["mesh"] = time.perf_counter() - started
+        else:
+            landmarks = last["landmarks"]
+            gaze = last["gaze"]
+
+        # ---------- EMOTION ----------
+        points = landmark_points(landmarks) if landmarks is not None else None
+        if self.scheduler.fer_due(points):
+            started = time.perf_counter()
+            # Same face the landmarks (and so the confusion score) come from;
+            # the detector box is only a fallback when the mesh lost it
+            if landmarks is not None:
+                box = face_box_from_landmarks(landmarks)
+            else:
+                box = detection_box
+            happy_prob, emotion_label, emotion_probs = self.classify_emotion(frame.for_model("fer"), box, landmarks)
+            ran["fer"] = time.perf_counter() - started
+        else:
+            happy_prob = last["happy_prob"]
+            emotion_label = last["emotion"]
+            emotion_probs = last["emotion_probs"]
+
+        self.scheduler.record(ran, points)
+        self.last = {
+            "face_count": face_count,
+            "landmarks": landmarks,
+            "gaze": gaze,
+            "happy_prob": happy_prob,
+            "emotion": emotion_label,
+            "emotion_probs": emotion_probs,
+            "face_box": detection_box,
+        }
+
+        return {
+            "face_count": face_count,
+            "status": status,
+            "emotion": emotion_label,
+            "landmarks": landmarks,
+            "tracked": landmarks is not None,  # gaze is measured, not a default
+            "happy_prob": happy_prob,
+            "emotion_probs": emotion_probs,
+            "gaze": gaze,
+            "stages": sorted(ran),
+            "timings": ran,
+            # Fields copied from an earlier frame because their stage was skipped
+            "carried_forward": [
+                field for stage in STAGES if stage not in ran for field in STAGE_FIELDS[stage]
+            ]
+        }
@@ -0,0 +1,77 @@
+# ml/schedule.py
+import numpy as np
+
+STAGES = ("detection", "mesh", "fer")
+
+# Telemetry fields each stage produces; labelled as carried forward when the
+# stage is skipped on a frame
+STAGE_FIELDS = {
+    "detection": ["face_count"],
+    "mesh": ["gaze"],
+    "fer": ["emotion", "happy_prob"],
+}
+
+# Mesh points used to measure head / face motion between FER runs:
+# nose tip, eye corners, mouth corners, inner brows
+MOTION_POINTS = [1, 33, 263, 61, 291, 70, 300]
+
+
+def parse_schedule(spec):
+    """'detection=1,mesh=1,fer=4' -> {'detection': 1, 'mesh': 1, 'fer': 4}"""
+    every = {stage: 1 for stage in STAGES}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        stage, n = part.split("=", 1)
+        stage = stage.strip()
+        if stage not in every:
+            raise ValueError(f"unknown inference stage '{stage}'")
+        every[stage] = max(1, int(n))
+    return every
+
+
+def landmark_points(landmarks):
+    """(len(MOTION_POINTS), 2) array of the points used for motion checks."""
+    return landmarks[MOTION_POINTS, :2]
+
+
+class StageScheduler:
+    """
+    Decides which models run on each frame for one student. A stage runs when
+    `every[stage]` frames have passed since it last ran; FER additionally runs
+    early when the face moved more than `fer_motion` (in eye-distance units)
+    since the last FER pass.
+    """
+
+    def __init__(self, every, fer_motion=0.0):
+        self.every = dict(every)
+        self.fer_motion = fer_motion
+        self.reset()
+
+    def reset(self):
+        self.since_run = {stage: None for stage in STAGES}
+        self.fer_points = None
+
+    def due(self, stage):
+        since = self.since_run[stage]
+        return since is None or since + 1 >= self.every[stage]
+
+    def fer_due(self, points):
+        """FER is due on schedule, or when the face moved a lot since its last run."""
+        if self.due("fer"):
+            return True
+        if self.fer_motion <= 0 or points is None or self.fer_points is None:
+            return False
+        scale = float(np.linalg.norm(points[1] - points[2])) or 1.0
+        motion = float(np.linalg.norm(points - self.fer_points, axis=1).mean()) / scale
+        return motion >= self.fer_motion
+
+    def record(self, ran, points=None):
+        """Advance the counters after a frame; `ran` is the set of stages that ran."""
+        for stage in STAGES:
+            if stage in ran:
+                self.since_run[stage] = 0
+            elif self.since_run[stage] is not None:
+                self.since_run[stage] += 1
+        if "fer" in ran:
+            self.fer_points = points
@@ -1,35 +1,99 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
-from database import Base
-
-class User(Base):
-    __tablename__ = "users"
-
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String)
-    email = Column(String, unique=True, index=True)
-    password_hash = Column(String)
-    role = Column(String)  # "student" or "teacher"
-
-    telemetry = relationship("Telemetry", back_populates="student")
-
-
-class Telemetry(Base):
-    __tablename__ = "telemetry"
-
-    id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("users.id"))
-    timestamp = Column(DateTime, default=datetime.utcnow)
-
-    face_count = Column(Integer)
-    gaze_direction = Column(String)
-    gaze_violation = Column(Boolean)
-    emotion = Column(String)
-    confused = Column(Boolean)
-    confusion_score = Column(Float)
-    head_tilt = Column(Float)
-    brow_metric = Column(Float)
-    happy_prob = Column(Float)
-
-    student = relationship("User", back_populates="telemetry")
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from database import Base
+
+class User(Base):
+    __tablename__ = "users"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    email = Column(String, unique=True, index=True)
+    password_hash = Column(String)
+    role = Column(String)  # "student" or "teacher"
+
+    telemetry = relationship("Telemetry", back_populates="student")
+
+
+class Telemetry(Base):
+    __tablename__ = "telemetry"
+    __table_args__ = (
+        # Reports read one student's rows in time order
+        Index("ix_telemetry_student_time", "student_id", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("users.id"))
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    face_count = Column(Integer)
+    gaze_direction = Column(String)
+    gaze_violation = Column(Boolean)
+    emotion = Column(String)
+    confused = Column(Boolean)
+    confusion_score = Column(Float)
+    head_tilt = Column(Float)
+    brow_metric = Column(Float)
+    happy_prob = Column(Float)
+    reused = Column(Boolean, default=False)  # result carried over from a near-identical frame
+
+    # Temporal features as of this frame (see features.py)
+    smoothed_confusion = Column(Float)
+    gaze_away_seconds = Column(Float)
+    face_absent_seconds = Column(Float)
+
+    student = relationship("User", back_populates="telemetry")
+
+
+class TelemetryMinute(Base):
+    """Per-student, per-minute rollup of Telemetry, kept up to date by telemetry_writer."""
+    __tablename__ = "telemetry_minute"
+
+    student_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    minute = Column(DateTime, primary_key=True)  # start of the minute, naive UTC
+
+    frames = Column(Integer, default=0)
+    confused = Column(Integer, default=0)
+    confusion_sum = Column(Float, default=0.0)
+    confusion_max = Column(Float, default=0.0)
+    smoothed_sum = Column(Float, default=0.0)  # smoothed_confusion, or the raw score where a row has none
+    happy_prob_sum = Column(Float, default=0.0)
+    happy_n = Column(Integer, default=0)  # frames with a happy_prob
+    emotion_happy = Column(Integer, default=0)
+    emotion_focused = Column(Integer, default=0)
+    emotion_confused = Column(Integer, default=0)
+    emotion_other = Column(Integer, default=0)
+    gaze_away = Column(Integer, default=0)
+    gaze_down = Column(Integer, default=0)
+    gaze_left = Column(Integer, default=0)
+    gaze_right = Column(Integer, default=0)
+    gaze_up = Column(Integer, default=0)
+    multi_face = Column(Integer, default=0)
+    face_min = Column(Integer)
+    face_max = Column(Integer)
+
+
+class ScoringVersion(Base):
+    """A confusion-scoring config that archived sessions were re-scored with (rescore.py)."""
+    __tablename__ = "scoring_version"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    config = Column(Text)  # JSON, same keys as ml.confusion.DEFAULT_SCORING
+    created_at = Column(DateTime, default=datetime.utcnow)
+    frames = Column(Integer, default=0)
+
+
+class ConfusionScore(Base):
+    """One archived frame re-scored under a ScoringVersion; matches Telemetry on (student_id, timestamp)."""
+    __tablename__ = "confusion_score"
+    __table_args__ = (
+        Index("ix_confusion_score_version_student_time", "version_id", "student_id", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    version_id = Column(Integer, ForeignKey("scoring_version.id"))
+    student_id = Column(Integer, ForeignKey("users.id"))
+    timestamp = Column(DateTime)
+    confusion_score = Column(Float)
+    confused = Column(Boolean)
@@ -0,0 +1,67 @@
+# protocol.py
+"""
+Binary WebSocket frame protocol (student -> server).
+
+Every binary message is a fixed 16-byte big-endian header followed by the
+payload:
+
+    offset  size  field
+    0       1     version       (PROTOCOL_VERSION)
+    1       1     message type  (MSG_FRAME_JPEG)
+    2       2     flags         (reserved, 0)
+    4       4     sequence number
+    8       8     capture timestamp, ms since epoch
+    16      ...   raw JPEG bytes
+
+Frontend/frameProtocol.js is the client side of this format.
+"""
+import base64
+import logging
+import struct
+from typing import NamedTuple, Optional
+
+log = logging.getLogger("smartsession")
+
+PROTOCOL_VERSION = 1
+MSG_FRAME_JPEG = 1
+
+HEADER = struct.Struct("!BBHIQ")
+HEADER_SIZE = HEADER.size
+
+
+class FrameHeader(NamedTuple):
+    version: int
+    msg_type: int
+    flags: int
+    seq: int
+    timestamp: int
+
+
+def parse_header(buf: bytes) -> FrameHeader:
+    """Validate and unpack the header of a binary message. Raises ValueError."""
+    if len(buf) < HEADER_SIZE:
+        raise ValueError(f"message too short ({len(buf)} bytes)")
+    header = FrameHeader(*HEADER.unpack_from(buf))
+    if header.version != PROTOCOL_VERSION:
+        raise ValueError(f"unsupported protocol version {header.version}")
+    if header.msg_type != MSG_FRAME_JPEG:
+        raise ValueError(f"unknown message type {header.msg_type}")
+    return header
+
+
+def pack_frame(jpeg: bytes, seq: int, timestamp: int) -> bytes:
+    """Build a binary frame message (used by tools and load tests)."""
+    return HEADER.pack(PROTOCOL_VERSION, MSG_FRAME_JPEG, 0, seq & 0xFFFFFFFF, timestamp) + jpeg
+
+
+def decode_base64_jpeg(b64_string) -> Optional[bytes]:
+    """Legacy JSON clients send a data URL; return the raw JPEG bytes."""
+    if not b64_string:
+        return None
+    try:
+        if "," in b64_string:
+            b64_string = b64_string.split(",", 1)[1]
+        return base64.b64decode(b64_string)
+    except Exception as e:
+        log.warning("Failed to decode base64 frame: %s", e)
+        return None
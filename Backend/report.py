@@ -1,74 +1,405 @@
-# report.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from models import Telemetry, User
-from database import get_db
-from datetime import datetime
-
-router = APIRouter(
-    prefix="/report",
-    tags=["report"]
-)
-
-# --- Utility to summarize telemetry ---
-def summarize_telemetry(telemetry_rows: List[Telemetry]):
-    if not telemetry_rows:
-        return {
-            "summary": {"confused_pct": 0, "happy_pct": 0, "focused_pct": 0},
-            "timeline": []
-        }
-
-    total = len(telemetry_rows)
-    confused = sum(1 for t in telemetry_rows if t.confused)
-    happy = sum(1 for t in telemetry_rows if t.emotion in ["Happy / Excited", "Happy / Engaged"])
-    focused = sum(1 for t in telemetry_rows if t.emotion in ["Focused / Neutral"])
-
-    summary = {
-        "confused_pct": round((confused / total) * 100),
-        "happy_pct": round((happy / total) * 100),
-        "focused_pct": round((focused / total) * 100)
-    }
-
-    timeline = [
-        {
-            "timestamp": t.timestamp.isoformat(),  # string ✅
-            "smoothed_confusion": t.confusion_score,  # renamed for frontend
-            "emotion": str(t.emotion or ""),         # always string ✅
-            "face_count": t.face_count,
-            "gaze": t.gaze_direction,
-            "happy_prob": getattr(t, "happy_prob", 0.0)
-        }
-        for t in telemetry_rows
-    ]
-
-    return {"summary": summary, "timeline": timeline}
-
-
-# --- GET report for a single student ---
-@router.get("/student/{student_id}")
-def get_student_report(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(User).filter(User.id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-
-    telemetry_rows = (
-        db.query(Telemetry)
-        .filter(Telemetry.student_id == student_id)
-        .order_by(Telemetry.timestamp)
-        .all()
-    )
-
-    result = summarize_telemetry(telemetry_rows)
-
-    # ✅ Attach student info
-    return {
-        "student": {
-            "id": student.id,
-            "name": student.name,
-            "email": student.email,
-            "role": student.role
-        },
-        "summary": result["summary"],
-        "timeline": result["timeline"]
-    }
+# report.py
+import base64
+import csv
+import io
+import json
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from models import Telemetry, TelemetryMinute, User
+from database import AsyncSessionLocal, get_async_db
+from report_cache import report_cache
+from rollups import FOCUSED_EMOTIONS, HAPPY_EMOTIONS, RAW_COLUMNS, ceil_minute, minute_of, rollup_rows
+from timeline import bucket_width, downsample_timeline, rollup_timeline
+from datetime import datetime, timezone
+
+router = APIRouter(
+    prefix="/report",
+    tags=["report"]
+)
+
+# Timeline rows per page when the caller doesn't pass `limit`, and the cap
+REPORT_PAGE_SIZE = int(os.getenv("REPORT_PAGE_SIZE", 10000))
+REPORT_MAX_PAGE_SIZE = int(os.getenv("REPORT_MAX_PAGE_SIZE", 50000))
+# Serve summaries and coarse timelines from the per-minute rollups
+REPORT_USE_ROLLUPS = os.getenv("REPORT_USE_ROLLUPS", "1") != "0"
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))
+
+
+# --- Keyset cursor: position after the last returned row ---
+def encode_cursor(row) -> str:
+    raw = f"{row.timestamp.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def as_utc_naive(value: Optional[datetime]):
+    """Timestamps are stored as naive UTC; accept aware bounds from the browser too."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# Columns the timeline needs, fetched as plain tuples instead of ORM objects
+TIMELINE_COLUMNS = (
+    Telemetry.id,
+    Telemetry.timestamp,
+    # Smoothed on the socket when the row was written; older rows only have the raw score
+    func.coalesce(Telemetry.smoothed_confusion, Telemetry.confusion_score),
+    Telemetry.emotion,
+    Telemetry.face_count,
+    Telemetry.gaze_direction,
+    Telemetry.happy_prob,
+)
+
+# Rollup columns for coarse timelines, in the order rollup_timeline() expects
+ROLLUP_COLUMNS = (
+    TelemetryMinute.minute,
+    TelemetryMinute.frames,
+    TelemetryMinute.smoothed_sum,
+    TelemetryMinute.happy_prob_sum,
+    TelemetryMinute.happy_n,
+    TelemetryMinute.emotion_happy,
+    TelemetryMinute.emotion_focused,
+    TelemetryMinute.emotion_confused,
+    TelemetryMinute.emotion_other,
+    TelemetryMinute.gaze_down,
+    TelemetryMinute.gaze_left,
+    TelemetryMinute.gaze_right,
+    TelemetryMinute.gaze_up,
+    TelemetryMinute.face_min,
+    TelemetryMinute.face_max,
+)
+
+
+def telemetry_range(student_id: int, from_: Optional[datetime], to: Optional[datetime]):
+    """WHERE clauses for one student's rows in [from, to)."""
+    clauses = [Telemetry.student_id == student_id]
+    if from_ is not None:
+        clauses.append(Telemetry.timestamp >= as_utc_naive(from_))
+    if to is not None:
+        clauses.append(Telemetry.timestamp < as_utc_naive(to))
+    return clauses
+
+
+# --- Summary: aggregate queries over the whole range ---
+# Totals are (frames, confused, happy, focused, confusion_sum, happy_prob_sum, happy_n);
+# happy_n counts the frames that have a happy_prob
+async def raw_totals(db: AsyncSession, clauses):
+    row = (await db.execute(
+        select(
+            func.count(),
+            func.count(case((Telemetry.confused, 1))),
+            func.count(case((Telemetry.emotion.in_(HAPPY_EMOTIONS), 1))),
+            func.count(case((Telemetry.emotion.in_(FOCUSED_EMOTIONS), 1))),
+            func.sum(Telemetry.confusion_score),
+            func.sum(Telemetry.happy_prob),
+            func.count(Telemetry.happy_prob),
+        ).where(*clauses)
+    )).one()
+    return [v or 0 for v in row]
+
+
+async def rollup_totals(db: AsyncSession, student_id: int, lo: Optional[datetime], hi: Optional[datetime]):
+    query = select(
+        func.sum(TelemetryMinute.frames),
+        func.sum(TelemetryMinute.confused),
+        func.sum(TelemetryMinute.emotion_happy),
+        func.sum(TelemetryMinute.emotion_focused),
+        func.sum(TelemetryMinute.confusion_sum),
+        func.sum(TelemetryMinute.happy_prob_sum),
+        func.sum(TelemetryMinute.happy_n),
+    ).where(*rollup_range(student_id, lo, hi))
+    return [v or 0 for v in (await db.execute(query)).one()]
+
+
+def rollup_range(student_id: int, lo: Optional[datetime], hi: Optional[datetime]):
+    """WHERE clauses for one student's rollup minutes starting in [lo, hi)."""
+    clauses = [TelemetryMinute.student_id == student_id]
+    if lo is not None:
+        clauses.append(TelemetryMinute.minute >= lo)
+    if hi is not None:
+        clauses.append(TelemetryMinute.minute < hi)
+    return clauses
+
+
+async def summarize_telemetry(db: AsyncSession, student_id: int, from_: Optional[datetime], to: Optional[datetime]):
+    """
+    Whole minutes inside [from, to) come from the rollups; only the partial
+    minutes at either edge are aggregated from raw rows.
+    """
+    from_, to = as_utc_naive(from_), as_utc_naive(to)
+    lo = ceil_minute(from_) if from_ is not None else None
+    hi = minute_of(to) if to is not None else None
+
+    if not REPORT_USE_ROLLUPS or (lo is not None and hi is not None and lo >= hi):
+        parts = [await raw_totals(db, telemetry_range(student_id, from_, to))]
+    else:
+        parts = [await rollup_totals(db, student_id, lo, hi)]
+        if from_ is not None and from_ < lo:
+            parts.append(await raw_totals(db, telemetry_range(student_id, from_, lo)))
+        if to is not None and hi < to:
+            parts.append(await raw_totals(db, telemetry_range(student_id, hi, to)))
+    total, confused, happy, focused, confusion_sum, happy_sum, happy_n = [sum(col) for col in zip(*parts)]
+
+    def pct(n):
+        return round((n / total) * 100) if total else 0
+
+    return {
+        "confused_pct": pct(confused),
+        "happy_pct": pct(happy),
+        "focused_pct": pct(focused),
+        "avg_confusion": round(confusion_sum / total, 3) if total else 0.0,
+        "avg_happy_prob": round(happy_sum / happy_n, 3) if happy_n else 0.0,
+        "frames": total,
+    }
+
+
+# --- Bucketed timelines ---
+async def timeline_extent(db, clauses):
+    """First and last timestamp in range: two seeks on ix_telemetry_student_time."""
+    first = await db.scalar(select(func.min(Telemetry.timestamp)).where(*clauses))
+    last = await db.scalar(select(func.max(Telemetry.timestamp)).where(*clauses))
+    return first, last
+
+
+async def rollup_minutes(db, student_id, from_, to):
+    """
+    Rollup rows (ROLLUP_COLUMNS) covering exactly [from, to): whole minutes
+    from the rollups, the partial minutes at either edge rolled up from raw
+    rows, as in summarize_telemetry().
+    """
+    lo = ceil_minute(from_) if from_ is not None else None
+    hi = minute_of(to) if to is not None else None
+
+    minutes, edges = [], []
+    if lo is not None and hi is not None and lo >= hi:
+        edges.append(telemetry_range(student_id, from_, to))
+    else:
+        minutes = (await db.execute(
+            select(*ROLLUP_COLUMNS).where(*rollup_range(student_id, lo, hi))
+        )).all()
+        if from_ is not None and from_ < lo:
+            edges.append(telemetry_range(student_id, from_, lo))
+        if to is not None and hi < to:
+            edges.append(telemetry_range(student_id, hi, to))
+
+    for clauses in edges:
+        rows = (await db.execute(select(*RAW_COLUMNS).where(*clauses))).all()
+        minutes += [
+            tuple(rollup[c.key] for c in ROLLUP_COLUMNS)
+            for rollup in rollup_rows([row._asdict() for row in rows])
+        ]
+    return sorted(minutes, key=lambda m: m[0])
+
+
+def build_timeline(rows):
+    return [
+        {
+            "timestamp": timestamp.isoformat(),  # string ✅
+            "smoothed_confusion": smoothed_confusion,
+            "emotion": str(emotion or ""),         # always string ✅
+            "face_count": face_count,
+            "gaze": gaze,
+            "happy_prob": happy_prob or 0.0
+        }
+        for _id, timestamp, smoothed_confusion, emotion, face_count, gaze, happy_prob in rows
+    ]
+
+
+# --- GET report for a single student ---
+@router.get("/student/{student_id}")
+async def get_student_report(
+    student_id: int,
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(REPORT_PAGE_SIZE, ge=1, le=REPORT_MAX_PAGE_SIZE),
+    max_points: Optional[int] = Query(None, ge=1, le=REPORT_MAX_PAGE_SIZE),
+    resolution: Optional[float] = Query(None, gt=0, description="bucket width in seconds"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    downsample = max_points is not None or resolution is not None
+    if downsample and cursor:
+        raise HTTPException(status_code=400, detail="cursor can't be combined with max_points/resolution")
+
+    # Cached until new telemetry for this student is flushed
+    from_, to = as_utc_naive(from_), as_utc_naive(to)
+    params = (from_, to, cursor, limit, max_points, resolution)
+    key = (student_id, params)
+    version = report_cache.version(student_id)
+    etag = report_cache.etag(student_id, params, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match and etag in {t.strip().removeprefix("W/") for t in if_none_match.split(",")}:
+        report_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    cached = report_cache.get(key, version)
+    if cached:
+        return Response(cached[2], media_type="application/json", headers=headers)
+
+    report = await build_student_report(db, student_id, from_, to, cursor, limit, max_points, resolution)
+    body = json.dumps(report).encode()
+    report_cache.put(key, version, etag, body)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def build_student_report(db, student_id, from_, to, cursor, limit, max_points, resolution):
+    downsample = max_points is not None or resolution is not None
+
+    student = await db.get(User, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    summary = await summarize_telemetry(db, student_id, from_, to)  # whole range, not just this page
+
+    # Served by ix_telemetry_student_time: range scan, no sort
+    clauses = telemetry_range(student_id, from_, to)
+    query = select(*TIMELINE_COLUMNS).where(*clauses)
+    if downsample:
+        # Bucketed over the whole range, so no paging
+        if resolution is None and summary["frames"] <= max_points:
+            rows = (await db.execute(query.order_by(Telemetry.timestamp, Telemetry.id))).all()
+            return report_response(student, summary, build_timeline(rows), None)
+
+        first, last = await timeline_extent(db, clauses)
+        if first is None:
+            return report_response(student, summary, [], None)
+        # Epoch-aligned buckets, labelled from `from` at the earliest: the raw
+        # rows and the rollups give the same timeline
+        max_buckets = None if resolution else max_points
+        width = bucket_width((last - first).total_seconds(), max_buckets, resolution)
+        start = from_ or first
+        if REPORT_USE_ROLLUPS and width % 60 == 0:
+            minutes = await rollup_minutes(db, student_id, from_, to)
+            timeline = rollup_timeline(minutes, width, start, first, max_buckets)
+        else:
+            rows = (await db.execute(query.order_by(Telemetry.timestamp, Telemetry.id))).all()
+            timeline = downsample_timeline(rows, width, start, max_buckets)
+        return report_response(student, summary, timeline, None)
+
+    if cursor:
+        query = query.where(tuple_(Telemetry.timestamp, Telemetry.id) > decode_cursor(cursor))
+
+    # One extra row tells us whether there is another page
+    rows = (await db.execute(
+        query.order_by(Telemetry.timestamp, Telemetry.id).limit(limit + 1)
+    )).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+
+    return report_response(student, summary, build_timeline(rows), next_cursor)
+
+
+def report_response(student, summary, timeline, next_cursor):
+    # ✅ Attach student info
+    return {
+        "student": {
+            "id": student.id,
+            "name": student.name,
+            "email": student.email,
+            "role": student.role
+        },
+        "summary": summary,
+        "timeline": timeline,
+        "next_cursor": next_cursor
+    }
+
+
+# --- Raw telemetry export, streamed ---
+EXPORT_COLUMNS = (
+    Telemetry.id,
+    Telemetry.timestamp,
+    Telemetry.face_count,
+    Telemetry.gaze_direction,
+    Telemetry.gaze_violation,
+    Telemetry.emotion,
+    Telemetry.confused,
+    Telemetry.confusion_score,
+    Telemetry.head_tilt,
+    Telemetry.brow_metric,
+    Telemetry.happy_prob,
+    Telemetry.reused,
+    Telemetry.smoothed_confusion,
+    Telemetry.gaze_away_seconds,
+    Telemetry.face_absent_seconds,
+)
+EXPORT_FIELDS = [c.key for c in EXPORT_COLUMNS]
+
+
+async def stream_rows(clauses):
+    """
+    Yield row chunks straight off a server-side cursor. The session is
+    opened here rather than taken from Depends() so it lives exactly as
+    long as the response body is being sent.
+    """
+    query = (
+        select(*EXPORT_COLUMNS)
+        .where(*clauses)
+        .order_by(Telemetry.timestamp, Telemetry.id)
+        .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for chunk in result.partitions():
+            yield chunk
+
+
+async def ndjson_lines(clauses):
+    async for chunk in stream_rows(clauses):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), default=datetime.isoformat) + "\n"
+            for row in chunk
+        )
+
+
+async def csv_lines(clauses):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_FIELDS)
+    yield buf.getvalue()
+    async for chunk in stream_rows(clauses):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(chunk)
+        yield buf.getvalue()
+
+
+@router.get("/student/{student_id}/export")
+async def export_student_telemetry(
+    student_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not await db.get(User, student_id):
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    clauses = telemetry_range(student_id, from_, to)
+    if format == "csv":
+        body, media_type = csv_lines(clauses), "text/csv"
+    else:
+        body, media_type = ndjson_lines(clauses), "application/x-ndjson"
+
+    filename = f"student_{student_id}_telemetry.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
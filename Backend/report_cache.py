@@ -0,0 +1,70 @@
+# report_cache.py
+import hashlib
+import os
+import uuid
+from collections import OrderedDict
+
+# Number of computed reports kept in memory
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", 256))
+
+
+class ReportCache:
+    """
+    LRU cache of serialized report bodies, keyed by student and query
+    parameters. Every student has a version number that telemetry_writer
+    bumps after committing new rows for them; an entry is only served while
+    its version is current. ETags are derived from (process epoch, student
+    version, parameters), so a matching If-None-Match can be answered
+    without computing or even looking up the report.
+
+    The cache lives in one process: with several server processes each one
+    keeps its own copy, and the backplane carries invalidations to all of them.
+    """
+
+    def __init__(self, max_entries=REPORT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (version, etag, body)
+        self.versions = {}
+        self.epoch = uuid.uuid4().hex[:8]  # ETags from a previous run never match
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def version(self, student_id):
+        return self.versions.get(student_id, 0)
+
+    def etag(self, student_id, params, version):
+        digest = hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+        return f'"{self.epoch}-{student_id}-{version}-{digest}"'
+
+    def get(self, key, version):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, version, etag, body):
+        self.entries[key] = (version, etag, body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, student_ids):
+        """New telemetry was written for these students."""
+        for student_id in student_ids:
+            self.versions[student_id] = self.version(student_id) + 1
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+report_cache = ReportCache()
@@ -0,0 +1,156 @@
+# rescore.py
+"""
+Re-score archived sessions (see landmark_archive.py) with a new confusion
+scoring config and store the result as a new scoring version.
+
+    cd Backend
+    python rescore.py --set brow_weight=0.5 --set threshold=0.6 --name "heavier brows"
+    python rescore.py --config scoring.json --session class-7b --student 12
+    python rescore.py --set tilt_scale=0.1 --dry-run     # compare only, write nothing
+
+Unset keys keep their value from ml.confusion.DEFAULT_SCORING. Archives
+are split into chunks and scored in parallel, one process per core by
+default, straight from the memory-mapped files. The new scores go into
+confusion_score under a new scoring_version row, one row per archived frame.
+They match Telemetry rows on (student_id, timestamp).
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import insert
+
+from database import Base, SessionLocal, engine
+from landmark_archive import ARCHIVE_DIR, HAS_LANDMARKS, find_archives, open_archive
+from ml.confusion import DEFAULT_SCORING, confusion_scores
+from models import ConfusionScore, ScoringVersion
+
+# Records scored per task
+CHUNK_RECORDS = 50000
+INSERT_CHUNK_ROWS = 5000
+
+
+def parse_scoring(config_path=None, overrides=()):
+    scoring = dict(DEFAULT_SCORING)
+    changes = {}
+    if config_path:
+        with open(config_path) as f:
+            changes.update(json.load(f))
+    for item in overrides:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--set expects key=value, got {item!r}")
+        changes[key.strip()] = value
+    for key, value in changes.items():
+        if key not in scoring:
+            raise ValueError(f"Unknown scoring key {key!r}; expected one of {', '.join(scoring)}")
+        scoring[key] = float(value)
+    return scoring
+
+
+def score_chunk(path, start, stop, scoring):
+    """Worker: score records [start, stop) of one archive."""
+    header, records = open_archive(path)
+    chunk = records[start:stop]
+    has_face = (chunk["flags"] & HAS_LANDMARKS) != 0
+    confused, scores = confusion_scores(chunk["landmarks"], chunk["happy_prob"], scoring)
+    return {
+        "student_id": int(header["student_id"]),
+        "timestamp_ms": np.array(chunk["timestamp_ms"]),
+        "scores": np.where(has_face, scores, 0.0),
+        "confused": confused & has_face,
+        "live_scores": np.array(chunk["confusion_score"], dtype=np.float64),
+        "live_confused": np.array(chunk["confusion_score"]) >= DEFAULT_SCORING["threshold"],
+    }
+
+
+def rescore(paths, scoring, workers=None):
+    tasks = []
+    for path in paths:
+        _header, records = open_archive(path)
+        tasks += [(path, start, min(start + CHUNK_RECORDS, len(records)))
+                  for start in range(0, len(records), CHUNK_RECORDS)]
+    if not tasks:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(score_chunk, *zip(*tasks), [scoring] * len(tasks)))
+
+
+def summarize(results):
+    scores = np.concatenate([r["scores"] for r in results])
+    live = np.concatenate([r["live_scores"] for r in results])
+    confused = np.concatenate([r["confused"] for r in results])
+    live_confused = np.concatenate([r["live_confused"] for r in results])
+    print(f"frames          {len(scores)}")
+    print(f"mean score      live {live.mean():.4f}   new {scores.mean():.4f}   "
+          f"mean |diff| {np.abs(scores - live).mean():.4f}")
+    print(f"confused        live {live_confused.mean() * 100:.1f} %   new {confused.mean() * 100:.1f} %   "
+          f"flipped {int((confused != live_confused).sum())} frames")
+
+
+def save(results, scoring, name):
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        version = ScoringVersion(
+            name=name,
+            config=json.dumps(scoring, sort_keys=True),
+            frames=sum(len(r["scores"]) for r in results),
+        )
+        db.add(version)
+        db.flush()
+
+        for r in results:
+            rows = [
+                {
+                    "version_id": version.id,
+                    "student_id": r["student_id"],
+                    # Same conversion as the live telemetry row
+                    "timestamp": datetime.fromtimestamp(ts / 1000, timezone.utc).replace(tzinfo=None),
+                    "confusion_score": score,
+                    "confused": flag,
+                }
+                for ts, score, flag in zip(r["timestamp_ms"].tolist(), r["scores"].tolist(), r["confused"].tolist())
+            ]
+            for i in range(0, len(rows), INSERT_CHUNK_ROWS):
+                db.execute(insert(ConfusionScore), rows[i:i + INSERT_CHUNK_ROWS])
+        db.commit()
+        return version.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score archived sessions with a new confusion-scoring config")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help="archive root (default: LANDMARK_ARCHIVE_DIR)")
+    parser.add_argument("--session", help="only this class session")
+    parser.add_argument("--student", type=int, help="only this student id")
+    parser.add_argument("--config", help="JSON file with scoring keys to change")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="change one scoring key")
+    parser.add_argument("--name", help="label stored with the scoring version")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="scoring processes")
+    parser.add_argument("--dry-run", action="store_true", help="print the comparison, store nothing")
+    args = parser.parse_args()
+
+    if not args.dir:
+        sys.exit("Set LANDMARK_ARCHIVE_DIR or pass --dir")
+    try:
+        scoring = parse_scoring(args.config, args.set)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    paths = find_archives(args.dir, args.session, args.student)
+    results = rescore(paths, scoring, args.workers)
+    if not results:
+        sys.exit(f"No archived frames found in {args.dir}")
+    print(f"Scored {len(paths)} archives with {json.dumps(scoring)}")
+    summarize(results)
+
+    if not args.dry_run:
+        version_id = save(results, scoring, args.name)
+        print(f"✅ Stored as scoring version {version_id}")
+
+
+if __name__ == "__main__":
+    main()
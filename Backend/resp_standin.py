@@ -0,0 +1,120 @@
+# resp_standin.py
+"""
+Tiny in-memory stand-in for the parts of Redis the backplane uses (pub/sub
+and a presence hash), for trying multi-process setups without a Redis
+install:
+
+    cd Backend
+    python resp_standin.py --port 6399
+    BACKPLANE_URL=redis://localhost:6399 uvicorn main:app --workers 2
+
+Supports PING, AUTH, SELECT, PUBLISH, SUBSCRIBE, UNSUBSCRIBE, HSET, HDEL,
+HGETALL and QUIT. Not for production.
+"""
+import argparse
+import asyncio
+
+
+def bulk(value):
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def array(items):
+    return b"*%d\r\n" % len(items) + b"".join(
+        b":%d\r\n" % i if isinstance(i, int) else bulk(i) for i in items
+    )
+
+
+class StandIn:
+    def __init__(self):
+        self.subscribers = {}  # channel -> set of writers
+        self.hashes = {}
+
+    async def read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command, e.g. from telnet
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle(self, reader, writer):
+        subscribed = set()
+        try:
+            while True:
+                args = await self.read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                name, args = args[0].upper(), args[1:]
+
+                if name == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+                elif name in (b"AUTH", b"SELECT"):
+                    writer.write(b"+OK\r\n")
+                elif name == b"PUBLISH":
+                    channel, message = args
+                    receivers = list(self.subscribers.get(channel, ()))
+                    for other in receivers:
+                        other.write(array([b"message", channel, message]))
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    for channel in args:
+                        if name == b"SUBSCRIBE":
+                            subscribed.add(channel)
+                            self.subscribers.setdefault(channel, set()).add(writer)
+                        else:
+                            subscribed.discard(channel)
+                            self.subscribers.get(channel, set()).discard(writer)
+                        writer.write(array([name.lower(), channel, len(subscribed)]))
+                elif name == b"HSET":
+                    table = self.hashes.setdefault(args[0], {})
+                    pairs = args[1:]
+                    added = sum(1 for field in pairs[::2] if field not in table)
+                    table.update(zip(pairs[::2], pairs[1::2]))
+                    writer.write(b":%d\r\n" % added)
+                elif name == b"HDEL":
+                    table = self.hashes.get(args[0], {})
+                    removed = sum(1 for field in args[1:] if table.pop(field, None) is not None)
+                    writer.write(b":%d\r\n" % removed)
+                elif name == b"HGETALL":
+                    table = self.hashes.get(args[0], {})
+                    writer.write(array([x for pair in table.items() for x in pair]))
+                else:
+                    writer.write(b"-ERR unknown command '%s'\r\n" % name.lower())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.subscribers.get(channel, set()).discard(writer)
+            writer.close()
+
+
+async def serve(host, port):
+    server = await asyncio.start_server(StandIn().handle, host, port)
+    print(f"🧪 RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory Redis stand-in for the backplane")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
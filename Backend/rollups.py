@@ -0,0 +1,161 @@
+# rollups.py
+"""
+Per-student, per-minute telemetry rollups (TelemetryMinute).
+
+telemetry_writer folds every flushed batch into the rollups in the same
+transaction as the raw insert. migrations.py rebuilds them at startup when
+an upgrade creates the table or adds a rollup column; to rebuild them by
+hand (e.g. after restoring raw telemetry):
+
+    cd Backend
+    python rollups.py                 # every student
+    python rollups.py --student 12    # one student
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import Base, engine, schema_lock
+from models import Telemetry, TelemetryMinute
+
+HAPPY_EMOTIONS = ["Happy / Excited", "Happy / Engaged"]
+FOCUSED_EMOTIONS = ["Focused / Neutral"]
+CONFUSED_EMOTIONS = ["Confused"]
+
+# Per-direction counters; CENTER is whatever's left of `frames`
+GAZE_FIELDS = {"DOWN": "gaze_down", "LEFT": "gaze_left", "RIGHT": "gaze_right", "UP": "gaze_up"}
+
+SUM_FIELDS = [
+    "frames", "confused", "confusion_sum", "smoothed_sum", "happy_prob_sum",
+    "happy_n", "emotion_happy", "emotion_focused", "emotion_confused", "emotion_other",
+    "gaze_away", "gaze_down", "gaze_left", "gaze_right", "gaze_up", "multi_face",
+]
+
+BACKFILL_CHUNK_ROWS = 5000
+
+
+def minute_of(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def ceil_minute(ts: datetime) -> datetime:
+    floor = minute_of(ts)
+    return floor if floor == ts else floor + timedelta(minutes=1)
+
+
+def emotion_field(emotion):
+    if emotion in HAPPY_EMOTIONS:
+        return "emotion_happy"
+    if emotion in FOCUSED_EMOTIONS:
+        return "emotion_focused"
+    if emotion in CONFUSED_EMOTIONS:
+        return "emotion_confused"
+    return "emotion_other"
+
+
+def rollup_rows(rows):
+    """Fold raw telemetry row dicts into one rollup dict per (student, minute)."""
+    buckets = {}
+    for row in rows:
+        key = (row["student_id"], minute_of(row["timestamp"]))
+        b = buckets.get(key)
+        if b is None:
+            b = dict.fromkeys(SUM_FIELDS, 0)
+            b.update(student_id=key[0], minute=key[1], confusion_max=0.0, face_min=None, face_max=None)
+            buckets[key] = b
+
+        score = row.get("confusion_score") or 0.0
+        smoothed = row.get("smoothed_confusion")
+        happy_prob = row.get("happy_prob")
+        gaze = row.get("gaze_direction") or "CENTER"
+        faces = row.get("face_count") or 0
+        b["frames"] += 1
+        b["confused"] += bool(row.get("confused"))
+        b["confusion_sum"] += score
+        b["confusion_max"] = max(b["confusion_max"], score)
+        # Same value the raw timeline shows: coalesce(smoothed_confusion, confusion_score)
+        b["smoothed_sum"] += score if smoothed is None else smoothed
+        if happy_prob is not None:
+            b["happy_prob_sum"] += happy_prob
+            b["happy_n"] += 1
+        b[emotion_field(row.get("emotion"))] += 1
+        b["gaze_away"] += gaze != "CENTER"
+        if gaze in GAZE_FIELDS:
+            b[GAZE_FIELDS[gaze]] += 1
+        b["multi_face"] += faces > 1
+        b["face_min"] = faces if b["face_min"] is None else min(b["face_min"], faces)
+        b["face_max"] = faces if b["face_max"] is None else max(b["face_max"], faces)
+    return list(buckets.values())
+
+
+def _upsert(dialect_name):
+    """INSERT ... ON CONFLICT (student_id, minute) DO UPDATE adding to the existing rollup."""
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = insert(TelemetryMinute)
+    table, new = TelemetryMinute.__table__.c, stmt.excluded
+    updates = {field: table[field] + new[field] for field in SUM_FIELDS}
+    updates["confusion_max"] = case((new.confusion_max > table.confusion_max, new.confusion_max), else_=table.confusion_max)
+    updates["face_min"] = case((new.face_min < table.face_min, new.face_min), else_=table.face_min)
+    updates["face_max"] = case((new.face_max > table.face_max, new.face_max), else_=table.face_max)
+    return stmt.on_conflict_do_update(index_elements=["student_id", "minute"], set_=updates)
+
+
+async def apply_rollups(db, rows):
+    """Add a batch of raw telemetry row dicts to the rollups (caller commits)."""
+    rollups = rollup_rows(rows)
+    if rollups:
+        await db.execute(_upsert(db.bind.dialect.name), rollups)
+
+
+# ---------- Backfill ----------
+RAW_COLUMNS = (
+    Telemetry.student_id,
+    Telemetry.timestamp,
+    Telemetry.face_count,
+    Telemetry.gaze_direction,
+    Telemetry.emotion,
+    Telemetry.confused,
+    Telemetry.confusion_score,
+    Telemetry.smoothed_confusion,
+    Telemetry.happy_prob,
+)
+
+
+def backfill(conn, student_id=None):
+    """
+    Drop and rebuild rollups from raw Telemetry, streamed in chunks, on a
+    sync connection (the caller commits). Synchronous so migrations.py can
+    run it at startup.
+    """
+    clear = delete(TelemetryMinute)
+    query = select(*RAW_COLUMNS).where(Telemetry.timestamp.is_not(None))
+    if student_id is not None:
+        clear = clear.where(TelemetryMinute.student_id == student_id)
+        query = query.where(Telemetry.student_id == student_id)
+    conn.execute(clear)
+
+    total = 0
+    upsert = _upsert(conn.dialect.name)
+    result = conn.execution_options(yield_per=BACKFILL_CHUNK_ROWS).execute(query)
+    for chunk in result.partitions():
+        conn.execute(upsert, rollup_rows([row._asdict() for row in chunk]))
+        total += len(chunk)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-minute telemetry rollups")
+    parser.add_argument("--student", type=int, help="only this student id")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    # Same lock as the startup migration, so the two never rebuild at once
+    with schema_lock(engine) as conn:
+        total = backfill(conn, args.student)
+    print(f"✅ Rolled up {total} telemetry rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# telemetry_writer.py
+import asyncio
+import os
+import time
+from collections import deque
+
+from sqlalchemy import insert
+
+from database import AsyncSessionLocal
+from models import Telemetry
+from backplane import backplane
+from rollups import apply_rollups
+import metrics
+
+# Flush when this many rows are waiting ...
+FLUSH_ROWS = int(os.getenv("TELEMETRY_FLUSH_ROWS", 200))
+# ... or at least this often
+FLUSH_INTERVAL_MS = int(os.getenv("TELEMETRY_FLUSH_MS", 1000))
+# Hard cap on buffered rows; the oldest are dropped beyond this
+MAX_BUFFERED_ROWS = int(os.getenv("TELEMETRY_MAX_BUFFERED", 20000))
+
+
+class TelemetryWriter:
+    """
+    Write-behind buffer for Telemetry rows. Student sockets call add(),
+    which never blocks or touches the database; a background task bulk
+    inserts the buffered rows with a short-lived async session.
+    """
+
+    def __init__(self, flush_rows=FLUSH_ROWS, flush_interval_ms=FLUSH_INTERVAL_MS, max_rows=MAX_BUFFERED_ROWS):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.buffer = deque(maxlen=max_rows)
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def add(self, row: dict):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1  # deque drops the oldest row
+            metrics.TELEMETRY_ROWS_DROPPED.inc()
+        self.buffer.append(row)
+        if len(self.buffer) >= self.flush_rows and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write out everything still buffered."""
+        if self._task is not None:
+            # Not cancelled: a flush in progress would lose the rows it holds
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self.buffer:
+            if not await self.flush():
+                break
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        if not self.buffer:
+            return True
+        rows = list(self.buffer)
+        self.buffer.clear()
+
+        started = time.perf_counter()
+        try:
+            await self._insert(rows)
+        except Exception as e:
+            print(f"⚠️ Telemetry flush of {len(rows)} rows failed:", e)
+            self.failed_flushes += 1
+            # Put them back in front of newer rows, as far as the bound allows
+            space = self.buffer.maxlen - len(self.buffer)
+            keep = rows[len(rows) - space:] if space < len(rows) else rows
+            self.buffer.extendleft(reversed(keep))
+            self.dropped += len(rows) - len(keep)
+            metrics.TELEMETRY_ROWS_DROPPED.inc(len(rows) - len(keep))
+            return False
+
+        elapsed = time.perf_counter() - started
+        metrics.observe("db_write", elapsed)
+        metrics.TELEMETRY_ROWS_WRITTEN.inc(len(rows))
+        elapsed_ms = elapsed * 1000
+        self.flushes += 1
+        self.written += len(rows)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        return True
+
+    @staticmethod
+    async def _insert(rows):
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Telemetry), rows)
+            await apply_rollups(db, rows)  # same transaction: rollups never drift from raw rows
+            await db.commit()
+        backplane.invalidate_reports({row["student_id"] for row in rows})  # every server process
+
+    def stats(self):
+        return {
+            "queue_depth": len(self.buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "max_flush_ms": round(self.max_flush_ms, 1),
+        }
+
+
+telemetry_writer = TelemetryWriter()
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# A throwaway SQLite database, set before database.py reads DATABASE_URL
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
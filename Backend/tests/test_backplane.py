@@ -0,0 +1,110 @@
+# tests/test_backplane.py
+import asyncio
+
+import backplane
+from backplane import RedisBackplane
+from resp_standin import StandIn
+
+SESSION = "s1"
+
+
+class Hub:
+    """Records what the backplane hands a TeacherHub."""
+
+    def __init__(self, rooms=()):
+        self.rooms = {session: set() for session in rooms}
+        self.room_listener = None
+        self.published = []
+        self.forgotten = []
+
+    def publish(self, packet, session, key):
+        self.published.append((packet, session, key))
+
+    def forget(self, session, key):
+        self.forgotten.append((session, key))
+
+
+class Cache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, student_ids):
+        self.invalidated.append(sorted(student_ids))
+
+
+async def until(check, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not check():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for the backplane"
+        await asyncio.sleep(0.01)
+
+
+def run_nodes(test):
+    """Runs `test(a, b)` against two backplane nodes sharing one stand-in server."""
+    async def main():
+        server = await asyncio.start_server(StandIn().handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        a = RedisBackplane(Hub(), f"redis://127.0.0.1:{port}/0", prefix="test")
+        b = RedisBackplane(Hub(rooms=[SESSION]), f"redis://127.0.0.1:{port}/0", prefix="test")
+        await a.start()
+        await b.start()
+        try:
+            await until(lambda: a.connected and b.connected)
+            await test(a, b)
+        finally:
+            await a.stop()
+            await b.stop()
+            server.close()
+            await server.wait_closed()
+    asyncio.run(main())
+
+
+def test_telemetry_reaches_teachers_on_other_nodes():
+    async def test(a, b):
+        a.publish_telemetry(SESSION, {"confusion": 0.4}, "7")
+        a.student_left(SESSION, "7")
+        await until(lambda: b.hub.forgotten)
+        assert a.hub.published == [({"confusion": 0.4}, SESSION, "7")]
+        assert b.hub.published == [({"confusion": 0.4}, SESSION, "7")]
+        assert b.hub.forgotten == [(SESSION, "7")]
+        assert a.received == 0  # its own messages are not delivered twice
+        assert a.published == 2 and a.rejected == 0
+    run_nodes(test)
+
+
+def test_invalidation_reaches_other_nodes(monkeypatch):
+    cache = Cache()
+    monkeypatch.setattr(backplane, "report_cache", cache)
+
+    async def test(a, b):
+        a.invalidate_reports({42, 7})
+        await until(lambda: len(cache.invalidated) == 2)
+        assert cache.invalidated == [[7, 42], [7, 42]]  # locally on a, then via b
+        assert b.received == 1
+    run_nodes(test)
+
+
+def test_presence_is_shared():
+    async def test(a, b):
+        await a.student_online(7, {"session": SESSION})
+        await until(lambda: a.published == 1)
+        assert (await b.online())["7"] == {"session": SESSION, "node": a.node}
+        await a.student_offline(7)
+        await until(lambda: a.published == 2)
+        assert await b.online() == {}
+    run_nodes(test)
+
+
+def test_error_replies_are_not_counted_as_published():
+    async def test(a, b):
+        a._send("NOSUCHCOMMAND")
+        a._send("PING")
+        await until(lambda: a.published + a.rejected == 2)
+        assert a.published == 1 and a.rejected == 1
+    run_nodes(test)
+
+
+def test_send_before_start_is_queued():
+    node = RedisBackplane(Hub(), "redis://127.0.0.1:1/0")
+    asyncio.run(node.student_online(7, {"session": SESSION}))
+    assert node.outbox.qsize() == 1
@@ -0,0 +1,50 @@
+# tests/test_landmarks.py
+import numpy as np
+import pytest
+
+landmark_pb2 = pytest.importorskip("mediapipe.framework.formats.landmark_pb2")
+
+from ml.landmarks import landmark_array  # noqa: E402
+
+
+def face(points, **extra):
+    lm = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points:
+        lm.landmark.add(x=x, y=y, z=z, **extra)
+    return lm
+
+
+def point_by_point(lm):
+    return np.array([(p.x, p.y, p.z) for p in lm.landmark], dtype=np.float32).reshape(-1, 3)
+
+
+@pytest.fixture
+def points():
+    return np.random.default_rng(0).uniform(-1, 1, size=(478, 3)).astype(np.float32)
+
+
+def test_serialized_fast_path(points):
+    assert np.array_equal(landmark_array(face(points)), points)
+
+
+def test_extra_fields_fall_back(points):
+    lm = face(points, visibility=0.5, presence=0.9)
+    assert np.array_equal(landmark_array(lm), point_by_point(lm))
+
+
+@pytest.mark.parametrize("omitted", [1, 17, 478])
+def test_omitted_fields_fall_back(points, omitted):
+    # A field that's never set isn't serialized: 17 of them leave the byte
+    # count a multiple of the record size
+    lm = landmark_pb2.NormalizedLandmarkList()
+    for i, (x, y, z) in enumerate(points):
+        if i < omitted:
+            lm.landmark.add(x=x, y=y)
+        else:
+            lm.landmark.add(x=x, y=y, z=z)
+    assert np.array_equal(landmark_array(lm), point_by_point(lm))
+
+
+def test_plain_sequence(points):
+    lm = face(points)
+    assert np.array_equal(landmark_array(list(lm.landmark)), points)
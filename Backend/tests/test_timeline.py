@@ -0,0 +1,94 @@
+# tests/test_timeline.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+import report
+from database import AsyncSessionLocal, engine, schema_lock
+from migrations import run_migrations
+from models import Telemetry, User
+from rollups import backfill
+
+STUDENT_ID = 1
+T0 = datetime(2026, 1, 1, 10, 0, 0, 250000)
+EMOTIONS = ["Focused / Neutral", "Happy / Engaged", "Confused", "Focused / Neutral", "Unknown"]
+GAZES = ["CENTER", "LEFT", "CENTER", "DOWN", "UP", "RIGHT", "LEFT"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def telemetry():
+    """~9 minutes of telemetry at 4 fps, with gaps and some rows missing values."""
+    run_migrations(engine)
+    rows = []
+    for i in range(2200):
+        if 700 <= i < 900:
+            continue  # a gap of 50 s
+        rows.append({
+            "student_id": STUDENT_ID,
+            "timestamp": T0 + timedelta(seconds=i * 0.25),
+            "face_count": 2 if i % 97 == 0 else 1,
+            "gaze_direction": GAZES[(i // 3) % len(GAZES)],
+            "emotion": EMOTIONS[(i // 7) % len(EMOTIONS)],
+            "confused": i % 11 == 0,
+            "confusion_score": (i % 10) / 10,
+            "smoothed_confusion": None if i % 5 == 0 else (i % 7) / 7,
+            "happy_prob": None if i % 4 == 0 else (i % 3) / 3,
+        })
+    with schema_lock(engine) as conn:
+        conn.execute(insert(User), [{"id": STUDENT_ID, "name": "s", "email": "s@x", "role": "student"}])
+        conn.execute(insert(Telemetry), rows)
+        backfill(conn)
+
+
+def timeline(use_rollups, from_=None, to=None, max_points=None, resolution=None, monkeypatch=None):
+    monkeypatch.setattr(report, "REPORT_USE_ROLLUPS", use_rollups)
+
+    async def build():
+        async with AsyncSessionLocal() as db:
+            return await report.build_student_report(
+                db, STUDENT_ID, from_, to, None, 100, max_points, resolution)
+    return asyncio.run(build())["timeline"]
+
+
+@pytest.mark.parametrize("from_, to, max_points, resolution", [
+    (datetime(2026, 1, 1, 10, 1, 52, 750000), None, None, 120),
+    (None, None, None, 60),
+    (datetime(2026, 1, 1, 10, 0, 30), datetime(2026, 1, 1, 10, 7, 10, 500000), None, 180),
+    (None, None, 4, None),
+    (datetime(2026, 1, 1, 10, 2, 15), datetime(2026, 1, 1, 10, 8, 45), 3, None),
+])
+def test_rollup_and_raw_timelines_match(monkeypatch, from_, to, max_points, resolution):
+    rollup_calls = []
+    real_rollup_minutes = report.rollup_minutes
+
+    async def counted(*args):
+        rollup_calls.append(args)
+        return await real_rollup_minutes(*args)
+    monkeypatch.setattr(report, "rollup_minutes", counted)
+
+    raw = timeline(False, from_, to, max_points, resolution, monkeypatch)
+    rolled = timeline(True, from_, to, max_points, resolution, monkeypatch)
+
+    assert rollup_calls, "the rollup path was not taken"
+    assert len(rolled) == len(raw)
+    for r, p in zip(raw, rolled):
+        assert p == {**r, "smoothed_confusion": pytest.approx(r["smoothed_confusion"]),
+                     "happy_prob": pytest.approx(r["happy_prob"])}
+    if max_points:
+        assert len(raw) <= max_points
+    if from_:
+        assert raw[0]["timestamp"] == from_.isoformat()
+    assert all(
+        (from_ is None or p["timestamp"] >= from_.isoformat()) and (to is None or p["timestamp"] < to.isoformat())
+        for p in raw
+    )
+
+
+def test_resolution_buckets_are_epoch_aligned(monkeypatch):
+    points = timeline(False, datetime(2026, 1, 1, 10, 1, 52, 750000), None, None, 120, monkeypatch)
+    assert [p["timestamp"] for p in points[:3]] == [
+        "2026-01-01T10:01:52.750000", "2026-01-01T10:02:00", "2026-01-01T10:04:00",
+    ]
+    assert points[0]["frames"] == 29  # 10:01:52.75 up to 10:02:00, 4 fps
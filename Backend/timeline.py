@@ -0,0 +1,162 @@
+# timeline.py
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Buckets are counted from here, so every path with the same width cuts at
+# the same instants (timestamps are naive UTC)
+EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_seconds(ts):
+    return (ts - EPOCH).total_seconds()
+
+
+def bucket_width(span_seconds, max_points=None, resolution=None):
+    """
+    Bucket width in seconds: `resolution`, else narrow enough that at most
+    `max_points` epoch-aligned buckets cover `span_seconds`. Widths of a
+    minute or more are rounded up to whole minutes, which rollup minutes
+    fill exactly.
+    """
+    if resolution:
+        return float(resolution)
+    width = (span_seconds or 1.0) / max(max_points - 1, 1)
+    return math.ceil(width / 60) * 60.0 if width >= 60 else width
+
+
+def bucket_keys(seconds, width, first, max_points=None):
+    """
+    Epoch-aligned bucket number for each epoch-seconds value. With
+    `max_points`, anything past the max_points-th bucket from `first` (epoch
+    seconds of the first row) joins that bucket.
+    """
+    keys = np.floor(np.asarray(seconds, dtype=np.float64) / width).astype(np.int64)
+    if max_points:
+        keys = np.minimum(keys, int(math.floor(first / width)) + max_points - 1)
+    return keys
+
+
+def bucket_label(key, width, start):
+    """Start of a bucket, but never before `start`, the start of the range."""
+    return max(EPOCH + timedelta(seconds=int(key) * width), start).isoformat()
+
+
+def _mean(values, starts):
+    """Per-bucket mean of a column that may contain None."""
+    arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    valid = ~np.isnan(arr)
+    sums = np.add.reduceat(np.where(valid, arr, 0.0), starts)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+
+def _dominant(labels, bucket_of_row, n_buckets):
+    """Most frequent label per bucket."""
+    names, codes = np.unique(np.array([str(v or "") for v in labels]), return_inverse=True)
+    table = np.zeros((n_buckets, len(names)), dtype=np.int64)
+    np.add.at(table, (bucket_of_row, codes), 1)
+    return names[table.argmax(axis=1)]
+
+
+def downsample_timeline(rows, width, start=None, max_points=None):
+    """
+    Aggregate time-ordered telemetry rows
+    (id, timestamp, smoothed_confusion, emotion, face_count, gaze, happy_prob)
+    into `width`-second buckets (see bucket_keys): mean confusion and
+    happy_prob, dominant emotion and gaze, min/max face count and the number
+    of frames in each bucket. Labels start at `start` at the earliest
+    (default: the first row).
+    """
+    if not rows:
+        return []
+    _ids, timestamps, confusion, emotions, face_counts, gazes, happy = zip(*rows)
+
+    start = start or timestamps[0]
+    seconds = np.fromiter((epoch_seconds(t) for t in timestamps), np.float64, len(rows))
+    index = bucket_keys(seconds, width, seconds[0], max_points)
+
+    # Rows are sorted by time, so each bucket is one contiguous run
+    new_bucket = np.r_[True, index[1:] != index[:-1]]
+    starts = np.flatnonzero(new_bucket)
+    bucket_of_row = np.cumsum(new_bucket) - 1
+    frames = np.diff(np.r_[starts, len(rows)])
+
+    faces = np.array([f or 0 for f in face_counts], dtype=np.int64)
+    face_min = np.minimum.reduceat(faces, starts)
+    face_max = np.maximum.reduceat(faces, starts)
+    mean_confusion = _mean(confusion, starts)
+    mean_happy = _mean(happy, starts)
+    emotion = _dominant(emotions, bucket_of_row, len(starts))
+    gaze = _dominant(gazes, bucket_of_row, len(starts))
+
+    return [
+        {
+            "timestamp": bucket_label(index[s], width, start),
+            "smoothed_confusion": float(mean_confusion[i]),
+            "emotion": str(emotion[i]),
+            "face_count": int(face_max[i]),
+            "face_count_min": int(face_min[i]),
+            "face_count_max": int(face_max[i]),
+            "gaze": str(gaze[i]),
+            "happy_prob": float(mean_happy[i]),
+            "frames": int(frames[i]),
+        }
+        for i, s in enumerate(starts)
+    ]
+
+
+# Dominant-emotion label for each rollup emotion counter
+ROLLUP_EMOTIONS = ["Happy / Engaged", "Focused / Neutral", "Confused", "Unknown"]
+# Gaze label for each rollup direction counter (CENTER is the remainder)
+ROLLUP_GAZES = ["DOWN", "LEFT", "RIGHT", "UP"]
+
+
+def _dominant_count(counts, labels):
+    """Label with the highest count; ties go to the first label in sorted order, as in _dominant()."""
+    return min(zip(labels, counts), key=lambda pair: (-pair[1], pair[0]))[0]
+
+
+def rollup_timeline(minutes, width, start, first, max_points=None):
+    """
+    Coarse timeline from per-minute rollup rows
+    (minute, frames, smoothed_sum, happy_prob_sum, happy_n, emotion_happy,
+    emotion_focused, emotion_confused, emotion_other, gaze_down, gaze_left,
+    gaze_right, gaze_up, face_min, face_max). `width` is a whole number of
+    minutes; the buckets, labels and fields are those downsample_timeline()
+    gives for the raw rows, whose first timestamp is `first`.
+    """
+    if not minutes:
+        return []
+    keys = bucket_keys([epoch_seconds(m[0]) for m in minutes], width, epoch_seconds(first), max_points)
+    buckets = {}
+    for key, (_minute, frames, smoothed_sum, happy_sum, happy_n, *counts, face_min, face_max) in zip(keys.tolist(), minutes):
+        emotions, gazes = counts[:len(ROLLUP_EMOTIONS)], counts[len(ROLLUP_EMOTIONS):]
+        b = buckets.get(key)
+        if b is None:
+            b = buckets[key] = [0, 0.0, 0.0, 0, [0] * len(ROLLUP_EMOTIONS), [0] * len(ROLLUP_GAZES), face_min, face_max]
+        b[0] += frames
+        b[1] += smoothed_sum
+        b[2] += happy_sum
+        b[3] += happy_n
+        b[4] = [a + n for a, n in zip(b[4], emotions)]
+        b[5] = [a + n for a, n in zip(b[5], gazes)]
+        b[6] = min(b[6], face_min)
+        b[7] = max(b[7], face_max)
+
+    timeline = []
+    for key, (frames, smoothed_sum, happy_sum, happy_n, emotions, gazes, face_min, face_max) in buckets.items():
+        n = frames or 1
+        timeline.append({
+            "timestamp": bucket_label(key, width, start),
+            "smoothed_confusion": smoothed_sum / n,
+            "emotion": _dominant_count(emotions, ROLLUP_EMOTIONS),
+            "face_count": face_max,
+            "face_count_min": face_min,
+            "face_count_max": face_max,
+            "gaze": _dominant_count([frames - sum(gazes)] + gazes, ["CENTER"] + ROLLUP_GAZES),
+            "happy_prob": happy_sum / happy_n if happy_n else 0.0,
+            "frames": frames,
+        })
+    return timeline
@@ -1,198 +1,342 @@
-# websocket.py
-import json
-import time
-from datetime import datetime
-from typing import Dict, List
-from fastapi import WebSocket, WebSocketDisconnect
-import jwt
-from database import SessionLocal
-from models import Telemetry
-from auth import SECRET, ALGO
-from models import User
-
-# ML imports
-import cv2
-from ml.proctor import ProctorEngine
-from ml.confusion import get_confusion_state
-import base64
-import numpy as np
-
-# --- In-memory connections & last telemetry ---
-students_ws: Dict[str, WebSocket] = {}
-teachers_ws: List[WebSocket] = []
-
-# Store last 10 confusion scores per student for smoothing
-confusion_history: Dict[str, List[float]] = {}
-
-# Initialize ML engine
-proctor = ProctorEngine()
-
-
-# --- Helper: decode base64 to OpenCV image ---
-def decode_base64_to_cv2(b64_string):
-    if not b64_string:
-        return None
-    try:
-        if "," in b64_string:
-            b64_string = b64_string.split(",")[1]
-        img_bytes = base64.b64decode(b64_string)
-        np_arr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        return frame
-    except Exception as e:
-        print("⚠️ Failed to decode frame:", e)
-        return None
-
-
-# -------- STUDENT SOCKET --------
-async def student_ws(websocket: WebSocket):
-    await websocket.accept()
-
-    # --- Authenticate ---
-    token = websocket.cookies.get("access_token")
-    if not token:
-        await websocket.close()
-        return
-
-    try:
-        user = jwt.decode(token, SECRET, algorithms=[ALGO])
-        if user["role"] != "student":
-            await websocket.close()
-            return
-    except Exception:
-        await websocket.close()
-        return
-    
-    db = SessionLocal()   # ✅ CREATE DB FIRST
-
-    student_id = user["user_id"]
-
-    student = db.query(User).filter(User.id == student_id).first()
-    student_name = student.name if student else f"Student {student_id}"
-
-    students_ws[student_id] = websocket
-    confusion_history.setdefault(student_id, [])
-
-    print(f"✅ Student {student_id} connected.")
-
-    try:
-        while True:
-            # inside while True:
-
-            data = await websocket.receive_json()
-            frame_data = data.get("frame")
-
-            frame = decode_base64_to_cv2(frame_data)
-
-            # ---------- PROCESS FRAME ----------
-            if frame is None:
-                proctor_data = {
-                    "face_count": 0,
-                    "status": "NO FRAME",
-                    "emotion": "Unknown",
-                    "landmarks": [],
-                    "happy_prob": 0.0,
-                    "gaze": "CENTER"
-                }
-            else:
-                proctor_data = proctor.process_frame(frame)
-
-            # ---------- CONFUSION ----------
-            try:
-                confused_flag, raw_confusion_score = get_confusion_state(
-                    proctor_data["landmarks"],
-                    proctor_data["happy_prob"]
-                )
-                
-            except Exception as e:
-                print("⚠️ confusion error:", e)
-                confused_flag = False
-                raw_confusion_score = 0.0
-
-            # ---------- SMOOTH ----------
-            history = confusion_history[student_id]
-            history.append(raw_confusion_score)
-            if len(history) > 8:
-                history.pop(0)
-
-            smoothed_confusion = sum(history) / len(history)
-
-            # ---------- TELEMETRY ----------
-            telemetry = {
-                "student_id": student_id,
-                "student_name": student_name, 
-                "face_count": proctor_data["face_count"],
-                "gaze": proctor_data["gaze"],
-                "emotion": proctor_data["emotion"],
-                "confusion_score": raw_confusion_score,
-                "smoothed_confusion": smoothed_confusion, 
-                "confused": confused_flag,
-                "confusion_threshold": 0.58,
-                "timestamp": int(time.time() * 1000)
-            }
-
-            # ---------- DEBUG PRINT ----------
-            print("📡 Telemetry:", telemetry)
-
-            # ---------- SAVE ----------
-            t = Telemetry(
-                student_id=student_id,
-                face_count=telemetry["face_count"],
-                gaze_direction=telemetry["gaze"],
-                emotion=telemetry["emotion"],
-                confused=telemetry["confused"],
-                confusion_score=telemetry["confusion_score"],
-                timestamp=datetime.fromtimestamp(telemetry["timestamp"] / 1000),
-            )
-            db.add(t)
-            db.commit()
-
-            # ---------- SEND TO TEACHERS ----------
-            packet = {
-                "type": "telemetry",
-                "student_id": student_id,
-                "student_name": student_name, 
-                "data": telemetry
-
-            }
-
-            for ws in teachers_ws[:]:
-                try:
-                    await ws.send_json(packet)
-                except:
-                    teachers_ws.remove(ws)
-
-    except WebSocketDisconnect:
-        print(f"❌ Student {student_id} disconnected")
-        students_ws.pop(student_id, None)
-        confusion_history.pop(student_id, None)
-    finally:
-        db.close()
-
-
-# -------- TEACHER SOCKET --------
-async def teacher_ws(websocket: WebSocket):
-    await websocket.accept()
-    token = websocket.cookies.get("access_token")
-    if not token:
-        await websocket.close()
-        return
-
-    try:
-        user = jwt.decode(token, SECRET, algorithms=[ALGO])
-        if user["role"] != "teacher":
-            await websocket.close()
-            return
-    except Exception:
-        await websocket.close()
-        return
-
-    teachers_ws.append(websocket)
-    print(f"✅ Teacher connected. Total: {len(teachers_ws)}")
-
-    try:
-        while True:
-            await websocket.receive_text()  # keep alive
-    except WebSocketDisconnect:
-        teachers_ws.remove(websocket)
-        print(f"❌ Teacher disconnected. Total: {len(teachers_ws)}")
+# websocket.py
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict
+from fastapi import WebSocket, WebSocketDisconnect
+import jwt
+from sqlalchemy import select
+from database import AsyncSessionLocal
+from telemetry_writer import telemetry_writer
+from auth import SECRET, ALGO
+from models import User
+
+# ML imports
+from inference import inference_pool
+from ml.confusion import CONFUSION_THRESHOLD
+from protocol import HEADER_SIZE, parse_header, decode_base64_jpeg
+from ingest import LatestFrameSlot
+from broadcast import DEFAULT_SESSION, session_key, teacher_hub
+from backplane import backplane
+from features import StudentFeatures
+from landmark_archive import ARCHIVE_DIR, archive_writer
+import metrics
+
+log = logging.getLogger("smartsession")
+
+# Every Nth telemetry packet is logged at DEBUG level (0 = none)
+TELEMETRY_LOG_EVERY = int(os.getenv("TELEMETRY_LOG_EVERY", 100))
+
+# --- In-memory connections (this process only; see backplane.py) ---
+students_ws: Dict[str, WebSocket] = {}
+# Teacher sockets, each with its own send queue (see broadcast.py)
+
+# Per-student ingestion counters (dropped frames, queue age)
+ingest_slots: Dict[str, LatestFrameSlot] = {}
+
+
+# --- Helper: placeholder result when a frame can't be analysed ---
+def empty_proctor_data(status):
+    return {
+        "face_count": 0,
+        "status": status,
+        "emotion": "Unknown",
+        "happy_prob": 0.0,
+        "gaze": "CENTER",
+        "tracked": False,
+        "confused": False,
+        "confusion_score": 0.0,
+        "reused": False,
+        "carried_forward": []
+    }
+
+
+# --- Helper: read the next frame message ---
+async def receive_frame(websocket: WebSocket):
+    """
+    Accepts binary frames (see protocol.py) and legacy JSON data-URL frames.
+    Returns (jpeg_buffer, offset, seq, capture_ts), or the parsed message
+    dict for messages that carry no frame (e.g. init). jpeg_buffer is None
+    if the frame was unreadable.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    # From here, not before receive(): waiting for the client's next frame isn't server time
+    started = time.perf_counter()
+
+    # ---------- BINARY (current clients) ----------
+    if message.get("bytes") is not None:
+        buf = message["bytes"]
+        try:
+            header = parse_header(buf)
+        except ValueError as e:
+            log.warning("Bad binary frame: %s", e)
+            return None, 0, None, None
+        metrics.observe("header_parse", time.perf_counter() - started)
+        # The JPEG is decoded in place, right after the header
+        return buf, HEADER_SIZE, header.seq, header.timestamp
+
+    # ---------- JSON (old clients) ----------
+    try:
+        data = json.loads(message.get("text") or "{}")
+    except ValueError:
+        return None, 0, None, None
+    if data.get("type") == "init":
+        return data
+    parsed = time.perf_counter()
+    metrics.observe("header_parse", parsed - started)
+    jpeg = decode_base64_jpeg(data.get("frame"))
+    metrics.observe("base64_decode", time.perf_counter() - parsed)
+    return jpeg, 0, data.get("seq"), data.get("timestamp")
+
+
+# -------- STUDENT SOCKET --------
+async def student_ws(websocket: WebSocket):
+    await websocket.accept()
+
+    # --- Authenticate ---
+    token = websocket.cookies.get("access_token")
+    if not token:
+        await websocket.close()
+        return
+
+    try:
+        user = jwt.decode(token, SECRET, algorithms=[ALGO])
+        if user["role"] != "student":
+            await websocket.close()
+            return
+    except Exception:
+        await websocket.close()
+        return
+
+    # --- Lease this student's own tracking engine ---
+    try:
+        lease = await inference_pool.lease()
+    except asyncio.TimeoutError:
+        log.warning("⚠️ No free inference engine, rejecting student")
+        await websocket.close(code=1013)  # try again later
+        return
+
+    student_id = user["user_id"]
+
+    # Short-lived session: no connection is held for the life of the socket
+    try:
+        async with AsyncSessionLocal() as db:
+            name = await db.scalar(select(User.name).where(User.id == student_id))
+    except BaseException:
+        await lease.release()  # the engine would be leaked for good otherwise
+        raise
+    student_name = name or f"Student {student_id}"
+
+    students_ws[student_id] = websocket
+    # Smoothing, gaze / absence timers and moving averages; lives with this socket
+    features = StudentFeatures()
+
+    log.info("✅ Student %s connected.", student_id)
+
+    # --- Receiver / processor split, joined by a latest-frame-wins slot ---
+    slot = LatestFrameSlot()
+    ingest_slots[student_id] = slot
+
+    # Which class this student's telemetry is routed to; set by the init message
+    session = {"id": DEFAULT_SESSION}
+
+    # Receiver: drain the socket as fast as frames arrive, keep only the newest
+    async def receive_frames():
+        while True:
+            incoming = await receive_frame(websocket)
+            if isinstance(incoming, dict):
+                new_session = session_key(incoming.get("session_id"))
+                if new_session != session["id"]:
+                    backplane.student_left(session["id"], student_id)
+                    session["id"] = new_session
+                    await backplane.student_online(student_id, {"name": student_name, "session": new_session})
+                log.info("🏫 Student %s joined session %s", student_id, session["id"])
+            elif incoming is not None:
+                slot.put(incoming)
+
+    # Processor: one frame at a time, always the most recent one
+    async def process_frames():
+        frames_done = 0
+        while True:
+            incoming = await slot.get()
+            if incoming is None:
+                return
+            jpeg, offset, seq, capture_ts = incoming
+
+            # ---------- PROCESS FRAME ----------
+            if jpeg is None:
+                proctor_data = empty_proctor_data("NO FRAME")
+                metrics.FRAMES_UNREADABLE.inc()
+            else:
+                # Decoded and analysed on this student's engine in the
+                # inference pool, the event loop stays free
+                started = time.perf_counter()
+                try:
+                    proctor_data = await lease.process(jpeg, offset)
+                except Exception as e:
+                    log.warning("Inference error for student %s: %s", student_id, e)
+                    proctor_data = empty_proctor_data("INFERENCE ERROR")
+                    metrics.FRAMES_FAILED.inc()
+                else:
+                    metrics.observe("inference", time.perf_counter() - started)
+                    metrics.observe_all(proctor_data.pop("timings", {}))
+                    (metrics.FRAMES_REUSED if proctor_data["reused"] else metrics.FRAMES_ANALYSED).inc()
+
+            # ---------- CONFUSION ----------
+            # Scored next to the models in the worker process
+            confused_flag = proctor_data["confused"]
+            raw_confusion_score = proctor_data["confusion_score"]
+
+            # ---------- TEMPORAL FEATURES ----------
+            started = time.perf_counter()
+            now = time.time()
+            signals = features.update(
+                now,
+                proctor_data["face_count"],
+                proctor_data["gaze"],
+                proctor_data["tracked"],
+                raw_confusion_score,
+                confused_flag,
+            )
+            status = proctor_data["status"]
+            if signals["gaze_violation"]:
+                status = f"LOOKING {proctor_data['gaze']}"
+            metrics.observe("features", time.perf_counter() - started)
+
+            # ---------- TELEMETRY ----------
+            telemetry = {
+                "student_id": student_id,
+                "student_name": student_name, 
+                "face_count": proctor_data["face_count"],
+                "gaze": proctor_data["gaze"],
+                "emotion": proctor_data["emotion"],
+                "status": status,
+                "confusion_score": raw_confusion_score,
+                "confused": confused_flag,
+                "confusion_threshold": CONFUSION_THRESHOLD,
+                "seq": seq,
+                "capture_ts": capture_ts,
+                "reused": proctor_data["reused"],  # near-duplicate frame, previous result carried over
+                "carried_forward": proctor_data["carried_forward"],  # fields whose model skipped this frame
+                **signals,  # smoothed_confusion, gaze_violation, durations, moving averages
+                "timestamp": int(now * 1000)
+            }
+
+            # ---------- DEBUG LOG (sampled) ----------
+            frames_done += 1
+            if TELEMETRY_LOG_EVERY and (frames_done - 1) % TELEMETRY_LOG_EVERY == 0:
+                log.debug("📡 Telemetry: %s", telemetry)
+
+            # ---------- SAVE ----------
+            # Buffered; bulk-inserted in the background by telemetry_writer
+            telemetry_writer.add({
+                "student_id": student_id,
+                "face_count": telemetry["face_count"],
+                "gaze_direction": telemetry["gaze"],
+                "emotion": telemetry["emotion"],
+                "confused": telemetry["confused"],
+                "confusion_score": telemetry["confusion_score"],
+                "happy_prob": proctor_data["happy_prob"],
+                "reused": telemetry["reused"],
+                "smoothed_confusion": signals["smoothed_confusion"],
+                "gaze_violation": signals["gaze_violation"],
+                "gaze_away_seconds": signals["gaze_away_seconds"],
+                "face_absent_seconds": signals["face_absent_seconds"],
+                "timestamp": datetime.fromtimestamp(telemetry["timestamp"] / 1000, timezone.utc).replace(tzinfo=None),  # naive UTC, like the column default
+            })
+
+            # ---------- SEND TO TEACHERS ----------
+            packet = {
+                "type": "telemetry",
+                "student_id": student_id,
+                "student_name": student_name, 
+                "session_id": session["id"],
+                "data": telemetry
+
+            }
+
+            # Queued for the teachers of this session, on every server process,
+            # and sent by their own tasks; never waits on a socket. A newer
+            # packet from this student replaces one still waiting.
+            started = time.perf_counter()
+            backplane.publish_telemetry(session["id"], packet, student_id)
+            metrics.observe("broadcast", time.perf_counter() - started)
+
+            # ---------- LANDMARK ARCHIVE ----------
+            # One record per telemetry row, for offline re-scoring (rescore.py);
+            # queued here, written to disk by archive_writer's thread
+            if ARCHIVE_DIR:
+                archive_writer.append(websocket, student_id, session["id"], telemetry["timestamp"], seq, proctor_data)
+
+    tasks = []
+    try:
+        await backplane.student_online(student_id, {"name": student_name, "session": session["id"]})
+        tasks = [
+            asyncio.create_task(receive_frames()),
+            asyncio.create_task(process_frames())
+        ]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()  # re-raise disconnects / errors
+    except WebSocketDisconnect:
+        log.info("❌ Student %s disconnected", student_id)
+    finally:
+        students_ws.pop(student_id, None)
+        slot.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        ingest_slots.pop(student_id, None)
+        if ARCHIVE_DIR:
+            archive_writer.close(websocket)
+        backplane.student_left(session["id"], student_id)
+        await backplane.student_offline(student_id)
+        await lease.release()
+
+
+# -------- TEACHER SOCKET --------
+async def teacher_ws(websocket: WebSocket):
+    await websocket.accept()
+    token = websocket.cookies.get("access_token")
+    if not token:
+        await websocket.close()
+        return
+
+    try:
+        user = jwt.decode(token, SECRET, algorithms=[ALGO])
+        if user["role"] != "teacher":
+            await websocket.close()
+            return
+    except Exception:
+        await websocket.close()
+        return
+
+    teacher_hub.add(websocket)
+    log.info("✅ Teacher connected. Total: %d", len(teacher_hub))
+
+    try:
+        while True:
+            # {"type": "subscribe", "sessions": ["math-101", ...]} picks the
+            # classes this teacher receives, "mode": "snapshot" switches from
+            # per-frame packets to periodic deltas; anything else is a keep-alive
+            try:
+                data = json.loads(await websocket.receive_text())
+            except ValueError:
+                continue
+            if isinstance(data, dict) and data.get("type") == "subscribe":
+                sessions = data.get("sessions") or [data.get("session_id")]
+                if not isinstance(sessions, list):
+                    sessions = [sessions]
+                mode = data.get("mode", "stream")
+                subscribed = teacher_hub.subscribe(websocket, sessions, mode)
+                teacher_hub.send_to(websocket, {"type": "subscribed", "sessions": subscribed, "mode": mode})
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        await teacher_hub.remove(websocket)
+        log.info("❌ Teacher disconnected. Total: %d", len(teacher_hub))
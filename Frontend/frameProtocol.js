@@ -0,0 +1,26 @@
+// Binary frame protocol shared with Backend/protocol.py
+//
+// | version u8 | type u8 | flags u16 | seq u32 | timestamp_ms u64 | JPEG bytes |
+export const PROTOCOL_VERSION = 1;
+export const MSG_FRAME_JPEG = 1;
+export const HEADER_SIZE = 16;
+
+function frameHeader(seq, timestamp) {
+  const header = new ArrayBuffer(HEADER_SIZE);
+  const view = new DataView(header);
+  view.setUint8(0, PROTOCOL_VERSION);
+  view.setUint8(1, MSG_FRAME_JPEG);
+  view.setUint16(2, 0);
+  view.setUint32(4, seq >>> 0);
+  view.setBigUint64(8, BigInt(timestamp));
+  return header;
+}
+
+// Encodes the canvas as JPEG and sends header + raw bytes as one binary
+// message. The Blob is sent as-is, so the JPEG is never base64'd or copied.
+export function sendCanvasFrame(ws, canvas, seq, timestamp = Date.now()) {
+  canvas.toBlob((jpeg) => {
+    if (!jpeg || ws.readyState !== WebSocket.OPEN) return;
+    ws.send(new Blob([frameHeader(seq, timestamp), jpeg]));
+  }, "image/jpeg");
+}